@@ -2,6 +2,7 @@ from typing import Dict, List, Optional
 from services import UserService, TaskService, ProjectService
 from models import TaskStatus, TaskPriority
 from utils import validate_email, sanitize_string
+from dependencies import DependencyCycleError
 import json
 
 
@@ -58,6 +59,18 @@ class UserAPI:
             "tasks_count": len(user.tasks)
         })
 
+    def get_user_stats(self, user_id: int) -> Dict:
+        user = self.service.get_user(user_id)
+        if not user:
+            return APIResponse.error("User not found", 404)
+
+        return APIResponse.success({
+            "user_id": user.user_id,
+            "active_tasks": user.get_active_count(),
+            "completed_tasks": user.get_completed_count(),
+            **user.rollup.to_dict()
+        })
+
     def list_users(self) -> Dict:
         users = self.service.get_all_users()
         user_list = [
@@ -182,6 +195,17 @@ class ProjectAPI:
             "progress": project.get_progress()
         })
 
+    def get_project_stats(self, project_id: int) -> Dict:
+        project = self.service.get_project(project_id)
+        if not project:
+            return APIResponse.error("Project not found", 404)
+
+        return APIResponse.success({
+            "project_id": project.project_id,
+            "progress": project.get_progress(),
+            **project.rollup.to_dict()
+        })
+
     def add_task(self, project_id: int, task_id: int, task_service: TaskService) -> Dict:
         task = task_service.get_task(task_id)
         if not task:
@@ -191,6 +215,41 @@ class ProjectAPI:
             return APIResponse.success(None, "Task added to project")
         return APIResponse.error("Project not found", 404)
 
+    def add_dependency(self, project_id: int, task_id: int, blocked_by_id: int, task_service: TaskService) -> Dict:
+        task = task_service.get_task(task_id)
+        blocked_by = task_service.get_task(blocked_by_id)
+        if not task or not blocked_by:
+            return APIResponse.error("Task not found", 404)
+        
+        try:
+            added = self.service.add_task_dependency(project_id, task, blocked_by)
+        except DependencyCycleError as e:
+            return APIResponse.error(str(e), 409)
+        
+        if added:
+            return APIResponse.success(None, "Dependency added")
+        return APIResponse.error("Project or task not found in project", 404)
+
+    def get_blocked_tasks(self, project_id: int) -> Dict:
+        project = self.service.get_project(project_id)
+        if not project:
+            return APIResponse.error("Project not found", 404)
+        
+        return APIResponse.success([
+            {"task_id": t.task_id, "title": t.title, "status": t.status.value}
+            for t in project.get_blocked_tasks()
+        ])
+
+    def get_critical_path(self, project_id: int) -> Dict:
+        project = self.service.get_project(project_id)
+        if not project:
+            return APIResponse.error("Project not found", 404)
+        
+        return APIResponse.success([
+            {"task_id": t.task_id, "title": t.title, "status": t.status.value}
+            for t in project.get_critical_path()
+        ])
+
     def list_projects(self) -> Dict:
         projects = self.service.get_all_projects()
         project_list = [
@@ -0,0 +1,164 @@
+from typing import Dict, Hashable, List, Optional, Set
+
+
+class DependencyCycleError(ValueError):
+    """Raised when a new dependency would close a cycle"""
+
+
+class DependencyGraph:
+    """Directed "blocks" graph kept in topological order incrementally.
+
+    The order is maintained with the Pearce-Kelly algorithm: inserting an
+    edge only reorders the nodes between its endpoints. Each node also keeps
+    a count of unfinished blockers so blocked/unblocked queries are O(1) and
+    finishing a node only touches its direct dependents.
+    """
+
+    def __init__(self):
+        self.blockers: Dict[Hashable, Set[Hashable]] = {}
+        self.dependents: Dict[Hashable, Set[Hashable]] = {}
+        self.done: Set[Hashable] = set()
+        self.blocked: Set[Hashable] = set()
+        self._pending: Dict[Hashable, int] = {}
+        self._position: Dict[Hashable, int] = {}
+        self._order: List[Hashable] = []
+        self._critical_path: Optional[List[Hashable]] = None
+
+    def __contains__(self, node: Hashable) -> bool:
+        return node in self._position
+
+    def add_node(self, node: Hashable, done: bool = False):
+        if node in self._position:
+            return
+        self.blockers[node] = set()
+        self.dependents[node] = set()
+        self._pending[node] = 0
+        self._position[node] = len(self._order)
+        self._order.append(node)
+        if done:
+            self.done.add(node)
+        self._critical_path = None
+
+    def add_dependency(self, node: Hashable, blocker: Hashable):
+        """Record that `node` cannot start until `blocker` is done"""
+        self.add_node(node)
+        self.add_node(blocker)
+        if node == blocker:
+            raise DependencyCycleError("A task cannot depend on itself")
+        if blocker in self.blockers[node]:
+            return
+
+        lower = self._position[node]
+        upper = self._position[blocker]
+        if lower < upper:
+            forward = self._collect(node, self.dependents, upper, ascending=True)
+            if forward is None:
+                raise DependencyCycleError("Dependency would create a cycle")
+            backward = self._collect(blocker, self.blockers, lower, ascending=False)
+            self._reorder(backward, forward)
+
+        self.blockers[node].add(blocker)
+        self.dependents[blocker].add(node)
+        if blocker not in self.done:
+            self._pending[node] += 1
+            if node not in self.done:
+                self.blocked.add(node)
+        self._critical_path = None
+
+    def _collect(
+        self,
+        start: Hashable,
+        edges: Dict[Hashable, Set[Hashable]],
+        bound: int,
+        ascending: bool,
+    ) -> Optional[List[Hashable]]:
+        """Nodes reachable from `start` whose position lies within `bound`.
+
+        Returns None when the forward search reaches the node at `bound`,
+        which means the new edge would close a cycle.
+        """
+        seen = {start}
+        stack = [start]
+        while stack:
+            current = stack.pop()
+            for neighbour in edges[current]:
+                position = self._position[neighbour]
+                if position == bound and ascending:
+                    return None
+                inside = position < bound if ascending else position > bound
+                if inside and neighbour not in seen:
+                    seen.add(neighbour)
+                    stack.append(neighbour)
+        return list(seen)
+
+    def _reorder(self, backward: List[Hashable], forward: List[Hashable]):
+        backward.sort(key=self._position.__getitem__)
+        forward.sort(key=self._position.__getitem__)
+        nodes = backward + forward
+        slots = sorted(self._position[node] for node in nodes)
+        for node, slot in zip(nodes, slots):
+            self._position[node] = slot
+            self._order[slot] = node
+
+    def mark_done(self, node: Hashable):
+        if node not in self._position or node in self.done:
+            return
+        self.done.add(node)
+        # A finished node is never reported as blocked, even if a blocker is still open
+        self.blocked.discard(node)
+        for dependent in self.dependents[node]:
+            self._pending[dependent] -= 1
+            if not self._pending[dependent]:
+                self.blocked.discard(dependent)
+        self._critical_path = None
+
+    def mark_undone(self, node: Hashable):
+        if node not in self.done:
+            return
+        self.done.discard(node)
+        if self._pending[node]:
+            self.blocked.add(node)
+        for dependent in self.dependents[node]:
+            self._pending[dependent] += 1
+            if dependent not in self.done:
+                self.blocked.add(dependent)
+        self._critical_path = None
+
+    def is_blocked(self, node: Hashable) -> bool:
+        return node in self.blocked
+
+    def blocked_nodes(self) -> List[Hashable]:
+        """Blocked nodes in topological order"""
+        return [node for node in self._order if node in self.blocked]
+
+    def topological_order(self) -> List[Hashable]:
+        return list(self._order)
+
+    def critical_path(self) -> List[Hashable]:
+        """Longest chain of unfinished nodes, cached until the graph changes"""
+        if self._critical_path is None:
+            self._critical_path = self._longest_pending_chain()
+        return list(self._critical_path)
+
+    def _longest_pending_chain(self) -> List[Hashable]:
+        length: Dict[Hashable, int] = {}
+        previous: Dict[Hashable, Optional[Hashable]] = {}
+        end = None
+        for node in self._order:
+            if node in self.done:
+                continue
+            best = None
+            for blocker in self.blockers[node]:
+                if blocker in length and (best is None or length[blocker] > length[best]):
+                    best = blocker
+            length[node] = length[best] + 1 if best is not None else 1
+            previous[node] = best
+            if end is None or length[node] > length[end]:
+                end = node
+
+        path = []
+        while end is not None:
+            path.append(end)
+            end = previous[end]
+        path.reverse()
+        return path
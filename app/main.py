@@ -82,16 +82,33 @@ def demo_workflow():
     project_api.add_task(1, 2, task_service)
     project_api.add_task(1, 3, task_service)
     
+    # CI/CD waits on authentication, which waits on documentation
+    print("\nAdding task dependencies...")
+    project_api.add_dependency(1, 3, 1, task_service)
+    project_api.add_dependency(1, 1, 2, task_service)
+    print(json.dumps(project_api.add_dependency(1, 2, 3, task_service), indent=2))
+    print(json.dumps(project_api.get_critical_path(1), indent=2))
+    
     # Update task status
     print("\nUpdating task statuses...")
     task_api.update_status(1, "in_progress")
     task_api.update_status(2, "done")
     
+    print("\nBlocked tasks:")
+    print(json.dumps(project_api.get_blocked_tasks(1), indent=2))
+    
     # Get project details
     print("\nProject details:")
     project_details = project_api.get_project(1)
     print(json.dumps(project_details, indent=2))
     
+    # Dashboard rollups
+    print("\nProject stats:")
+    print(json.dumps(project_api.get_project_stats(1), indent=2))
+
+    print("\nUser stats:")
+    print(json.dumps(user_api.get_user_stats(1), indent=2))
+    
     # List all tasks
     print("\nAll tasks:")
     all_tasks = task_api.list_tasks()
@@ -1,6 +1,7 @@
-from datetime import datetime
-from typing import Optional, List
+from datetime import datetime, date
+from typing import Optional, List, Dict
 from enum import Enum
+from dependencies import DependencyGraph
 
 
 class TaskStatus(Enum):
@@ -17,6 +18,50 @@ class TaskPriority(Enum):
     CRITICAL = 4
 
 
+class TaskRollup:
+    """Task counts by status and priority, kept up to date on every mutation"""
+
+    def __init__(self):
+        self.total = 0
+        self.by_status: Dict[TaskStatus, int] = {status: 0 for status in TaskStatus}
+        self.by_priority: Dict[TaskPriority, int] = {priority: 0 for priority in TaskPriority}
+        self.completed_per_day: Dict[date, int] = {}
+
+    def add(self, task: 'Task'):
+        self._apply(task, 1)
+
+    def remove(self, task: 'Task'):
+        self._apply(task, -1)
+
+    def _apply(self, task: 'Task', delta: int):
+        self.total += delta
+        self.by_status[task.status] += delta
+        self.by_priority[task.priority] += delta
+        if task.status == TaskStatus.DONE and task.completed_at:
+            day = task.completed_at.date()
+            count = self.completed_per_day.get(day, 0) + delta
+            if count:
+                self.completed_per_day[day] = count
+            else:
+                del self.completed_per_day[day]
+
+    def count(self, status: TaskStatus) -> int:
+        return self.by_status[status]
+
+    def completed_on(self, day: date) -> int:
+        return self.completed_per_day.get(day, 0)
+
+    def to_dict(self) -> Dict:
+        return {
+            "total": self.total,
+            "by_status": {status.value: n for status, n in self.by_status.items()},
+            "by_priority": {priority.name.lower(): n for priority, n in self.by_priority.items()},
+            "completed_per_day": {
+                day.isoformat(): n for day, n in sorted(self.completed_per_day.items())
+            },
+        }
+
+
 class User:
     def __init__(self, user_id: int, name: str, email: str):
         self.user_id = user_id
@@ -24,6 +69,7 @@ class User:
         self.email = email
         self.created_at = datetime.now()
         self.tasks: List['Task'] = []
+        self.rollup = TaskRollup()
 
     def get_active_tasks(self):
         return [task for task in self.tasks if task.status != TaskStatus.DONE]
@@ -31,6 +77,12 @@ class User:
     def get_completed_tasks(self):
         return [task for task in self.tasks if task.status == TaskStatus.DONE]
 
+    def get_active_count(self) -> int:
+        return self.rollup.total - self.rollup.count(TaskStatus.DONE)
+
+    def get_completed_count(self) -> int:
+        return self.rollup.count(TaskStatus.DONE)
+
     def __repr__(self):
         return f"User(id={self.user_id}, name='{self.name}', email='{self.email}')"
 
@@ -53,22 +105,53 @@ class Task:
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
         self.completed_at: Optional[datetime] = None
+        # User whose task list (and rollup) currently holds this task
+        self._owner: Optional[User] = None
+        self._projects: List['Project'] = []
+
+    def _rollups(self) -> List[TaskRollup]:
+        rollups = [project.rollup for project in self._projects]
+        if self._owner:
+            rollups.append(self._owner.rollup)
+        return rollups
 
     def assign_to(self, user: User):
         self.assigned_to = user
         self.updated_at = datetime.now()
+        if user is self._owner:
+            return
+        if self._owner:
+            self._owner.tasks.remove(self)
+            self._owner.rollup.remove(self)
+        self._owner = user
         if user:
             user.tasks.append(self)
+            user.rollup.add(self)
 
     def update_status(self, status: TaskStatus):
+        rollups = self._rollups()
+        for rollup in rollups:
+            rollup.remove(self)
         self.status = status
         self.updated_at = datetime.now()
         if status == TaskStatus.DONE:
             self.completed_at = datetime.now()
+        for rollup in rollups:
+            rollup.add(self)
+        for project in self._projects:
+            if status == TaskStatus.DONE:
+                project.dependencies.mark_done(self)
+            else:
+                project.dependencies.mark_undone(self)
 
     def set_priority(self, priority: TaskPriority):
+        rollups = self._rollups()
+        for rollup in rollups:
+            rollup.remove(self)
         self.priority = priority
         self.updated_at = datetime.now()
+        for rollup in rollups:
+            rollup.add(self)
 
     def is_overdue(self, deadline: datetime) -> bool:
         if self.status == TaskStatus.DONE:
@@ -88,9 +171,30 @@ class Project:
         self.tasks: List[Task] = []
         self.members: List[User] = [owner]
         self.created_at = datetime.now()
+        self.rollup = TaskRollup()
+        self.dependencies = DependencyGraph()
 
     def add_task(self, task: Task):
         self.tasks.append(task)
+        task._projects.append(self)
+        self.rollup.add(task)
+        self.dependencies.add_node(task, done=task.status == TaskStatus.DONE)
+
+    def add_dependency(self, task: Task, blocked_by: Task) -> bool:
+        """Make `task` wait for `blocked_by`; raises DependencyCycleError on cycles"""
+        if task not in self.dependencies or blocked_by not in self.dependencies:
+            return False
+        self.dependencies.add_dependency(task, blocked_by)
+        return True
+
+    def is_blocked(self, task: Task) -> bool:
+        return self.dependencies.is_blocked(task)
+
+    def get_blocked_tasks(self) -> List[Task]:
+        return self.dependencies.blocked_nodes()
+
+    def get_critical_path(self) -> List[Task]:
+        return self.dependencies.critical_path()
 
     def add_member(self, user: User):
         if user not in self.members:
@@ -104,10 +208,9 @@ class Project:
         return [task for task in self.tasks if task.status == status]
 
     def get_progress(self):
-        if not self.tasks:
+        if not self.rollup.total:
             return 0.0
-        completed = len([t for t in self.tasks if t.status == TaskStatus.DONE])
-        return (completed / len(self.tasks)) * 100
+        return (self.rollup.count(TaskStatus.DONE) / self.rollup.total) * 100
 
     def __repr__(self):
         return f"Project(id={self.project_id}, name='{self.name}', tasks={len(self.tasks)})"
@@ -113,6 +113,12 @@ class ProjectService:
             return True
         return False
 
+    def add_task_dependency(self, project_id: int, task: Task, blocked_by: Task) -> bool:
+        project = self.get_project(project_id)
+        if project:
+            return project.add_dependency(task, blocked_by)
+        return False
+
     def add_member_to_project(self, project_id: int, user: User) -> bool:
         project = self.get_project(project_id)
         if project:
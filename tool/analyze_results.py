@@ -1,15 +1,49 @@
 """
 Script para analisar e comparar os resultados da LLM vs SonarQube.
+
+Uso:
+    python analyze_results.py [pr_N.json | diretorio]
+    python analyze_results.py diretorio --agregado [--saida DIR] [--workers N]
 """
+import argparse
+import csv
 import json
+import os
+import sys
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
 from pathlib import Path
-from collections import defaultdict
+from typing import Iterable, Iterator, Optional
+
+from utils.dataset_store import DatasetStore, is_store
+from utils.matching import match_findings, sonar_path
+
+# Arquivos de dataset enviados a cada tarefa do pool de processos
+ARQUIVOS_POR_TAREFA = 64
 
+COLUNAS_POR_PR = [
+    "pr_number", "pr_author", "created_at", "llm_smells", "sonar_issues",
+    "ambos", "apenas_llm", "apenas_sonarqube", "ground_truth",
+]
 
-def analyze_dataset(dataset_path: str):
-    """Analisa um arquivo de dataset e compara LLM vs SonarQube."""
+
+def analyze_dataset(
+    dataset_path: str,
+    data: Optional[dict] = None,
+    janela: int = 0,
+    equivalencia: bool = False,
+):
+    """
+    Analisa um arquivo de dataset (ou um registro já carregado) e compara LLM vs SonarQube.
+
+    Um smell da LLM e uma issue do SonarQube contam como o mesmo achado quando
+    estão no mesmo arquivo a até `janela` linhas de distância e, com
+    `equivalencia`, são do mesmo tipo (ver utils.matching.SMELL_CATEGORIES).
+    """
     
-    data = json.loads(Path(dataset_path).read_text())
+    if data is None:
+        data = json.loads(Path(dataset_path).read_text())
     
     print("=" * 80)
     print(f"ANÁLISE DO PR #{data['pr_number']}")
@@ -73,31 +107,23 @@ def analyze_dataset(dataset_path: str):
     print("ANÁLISE DE SOBREPOSIÇÃO:")
     print("=" * 80)
     
-    # Cria mapa de linhas
-    llm_lines = {(smell['file'], smell['line']) for smell in llm_smells}
-    sonar_lines = {
-        (issue.get('component', '').split(':', 1)[-1], issue.get('line'))
-        for issue in sonar_issues
-    }
-    
-    overlap = llm_lines & sonar_lines
-    llm_only = llm_lines - sonar_lines
-    sonar_only = sonar_lines - llm_lines
+    # Pareamento um-para-um, tolerando ±janela linhas de diferença
+    result = match_findings(llm_smells, sonar_issues, janela, equivalencia)
+    criterio = f"janela ±{janela} linha(s)" + (", mesmo tipo de smell" if equivalencia else "")
+    print(f"Critério: {criterio}")
     
-    print(f"\n✅ Detectados por ambos: {len(overlap)} localizações")
-    if overlap:
-        for file, line in sorted(overlap):
-            print(f"  - {file}:{line}")
+    print(f"\n✅ Detectados por ambos: {len(result.matches)} achado(s)")
+    for match in result.matches:
+        print(f"  - {match.llm['file']}:{match.llm['line']} ↔ L{match.sonar['line']} "
+              f"({match.llm['smell_type']} / {match.sonar.get('rule')})")
     
-    print(f"\n🤖 Detectados apenas pela LLM: {len(llm_only)} localizações")
-    if llm_only:
-        for file, line in sorted(llm_only):
-            print(f"  - {file}:{line}")
+    print(f"\n🤖 Detectados apenas pela LLM: {len(result.llm_only)} achado(s)")
+    for smell in result.llm_only:
+        print(f"  - {smell['file']}:{smell['line']} ({smell['smell_type']})")
     
-    print(f"\n🔍 Detectados apenas pelo SonarQube: {len(sonar_only)} localizações")
-    if sonar_only:
-        for file, line in sorted(sonar_only):
-            print(f"  - {file}:{line}")
+    print(f"\n🔍 Detectados apenas pelo SonarQube: {len(result.sonar_only)} achado(s)")
+    for issue in result.sonar_only:
+        print(f"  - {sonar_path(issue)}:{issue.get('line')} ({issue.get('rule')})")
     
     # Estatísticas de tipos
     print("\n" + "=" * 80)
@@ -121,7 +147,7 @@ def analyze_dataset(dataset_path: str):
     print("\n" + "=" * 80)
 
 
-def compare_multiple_datasets(dataset_dir: str = "dataset-pr-6"):
+def compare_multiple_datasets(dataset_dir: str = "dataset-pr-6", janela: int = 0, equivalencia: bool = False):
     """Compara múltiplos datasets."""
     dataset_path = Path(dataset_dir)
     
@@ -129,6 +155,14 @@ def compare_multiple_datasets(dataset_dir: str = "dataset-pr-6"):
         print(f"❌ Diretório {dataset_dir} não encontrado")
         return
     
+    if is_store(dataset_path):
+        store = DatasetStore(dataset_path)
+        print(f"📂 Analisando {len(store)} PR(s) do store...\n")
+        for record in store.scan():
+            analyze_dataset(f"store:{record.get('pr_number')}", record, janela, equivalencia)
+            print("\n")
+        return
+    
     json_files = list(dataset_path.glob("pr_*.json"))
     
     if not json_files:
@@ -138,16 +172,230 @@ def compare_multiple_datasets(dataset_dir: str = "dataset-pr-6"):
     print(f"📂 Analisando {len(json_files)} dataset(s)...\n")
     
     for json_file in sorted(json_files):
-        analyze_dataset(str(json_file))
+        analyze_dataset(str(json_file), janela=janela, equivalencia=equivalencia)
         print("\n")
 
 
+def pr_statistics(dataset_path: str, janela: int = 0, equivalencia: bool = False) -> dict:
+    """
+    Reduz um arquivo de dataset às estatísticas usadas na agregação.
+
+    Roda nos processos do pool, então devolve apenas contagens (nunca os
+    smells completos) para manter pequeno o que volta ao processo principal.
+    """
+    try:
+        data = json.loads(Path(dataset_path).read_text())
+    except (OSError, ValueError) as exc:
+        return {"arquivo": dataset_path, "erro": str(exc)}
+    return summarize_pr(data, dataset_path, janela, equivalencia)
+
+
+def summarize_pr(data: dict, origem: str, janela: int = 0, equivalencia: bool = False) -> dict:
+    """Contagens e histogramas de um PR já carregado."""
+    llm_smells = data.get('llm_smells', [])
+    sonar_issues = data.get('sonar_issues', [])
+    result = match_findings(llm_smells, sonar_issues, janela, equivalencia)
+
+    return {
+        "arquivo": origem,
+        "pr_number": data.get('pr_number'),
+        "pr_author": data.get('pr_author'),
+        "created_at": data.get('created_at'),
+        "llm_smells": len(llm_smells),
+        "sonar_issues": len(sonar_issues),
+        "ambos": len(result.matches),
+        "apenas_llm": len(result.llm_only),
+        "apenas_sonarqube": len(result.sonar_only),
+        "ground_truth": data.get('ground_truth_smells', []),
+        "tipos_llm": Counter(smell.get('smell_type') for smell in llm_smells),
+        "severidades_llm": Counter(smell.get('severity') for smell in llm_smells),
+        "regras_sonarqube": Counter(issue.get('rule') for issue in sonar_issues),
+        "severidades_sonarqube": Counter(issue.get('severity') for issue in sonar_issues),
+    }
+
+
+def pr_statistics_batch(dataset_paths: list[str], janela: int = 0, equivalencia: bool = False) -> list[dict]:
+    """Processa um lote de arquivos em uma única tarefa do pool."""
+    return [pr_statistics(path, janela, equivalencia) for path in dataset_paths]
+
+
+def record_statistics_batch(records: list[bytes], janela: int = 0, equivalencia: bool = False) -> list[dict]:
+    """Processa um lote de registros brutos do DatasetStore em uma única tarefa do pool."""
+    stats = []
+    for record in records:
+        try:
+            data = json.loads(record)
+        except ValueError as exc:
+            stats.append({"arquivo": "store", "erro": str(exc)})
+            continue
+        stats.append(summarize_pr(data, f"store:{data.get('pr_number')}", janela, equivalencia))
+    return stats
+
+
+class DatasetAggregate:
+    """Totais e histogramas acumulados PR a PR, sem guardar os datasets."""
+
+    HISTOGRAMAS = ("tipos_llm", "severidades_llm", "regras_sonarqube", "severidades_sonarqube")
+    TOTAIS = ("llm_smells", "sonar_issues", "ambos", "apenas_llm", "apenas_sonarqube")
+
+    def __init__(self):
+        self.prs = 0
+        self.erros: list[dict] = []
+        self.totais = Counter()
+        self.histogramas = {nome: Counter() for nome in self.HISTOGRAMAS}
+        self.ground_truth = Counter()
+        self.prs_sem_llm = 0
+        self.prs_sem_sonarqube = 0
+
+    def add(self, stats: dict) -> None:
+        if "erro" in stats:
+            self.erros.append({"arquivo": stats["arquivo"], "erro": stats["erro"]})
+            return
+        self.prs += 1
+        for nome in self.TOTAIS:
+            self.totais[nome] += stats[nome]
+        for nome in self.HISTOGRAMAS:
+            self.histogramas[nome].update(stats[nome])
+        self.ground_truth.update(stats["ground_truth"])
+        self.prs_sem_llm += stats["llm_smells"] == 0
+        self.prs_sem_sonarqube += stats["sonar_issues"] == 0
+
+    def to_dict(self) -> dict:
+        localizacoes = self.totais["ambos"] + self.totais["apenas_llm"] + self.totais["apenas_sonarqube"]
+        return {
+            "prs": self.prs,
+            "totais": dict(self.totais),
+            "media_por_pr": {
+                nome: self.totais[nome] / self.prs if self.prs else 0.0 for nome in self.TOTAIS
+            },
+            # Fração dos achados apontados pelas duas ferramentas (cada par conta uma vez)
+            "sobreposicao": self.totais["ambos"] / localizacoes if localizacoes else 0.0,
+            "prs_sem_llm": self.prs_sem_llm,
+            "prs_sem_sonarqube": self.prs_sem_sonarqube,
+            "ground_truth": dict(self.ground_truth.most_common()),
+            **{nome: dict(contagem.most_common()) for nome, contagem in self.histogramas.items()},
+            "erros": self.erros,
+        }
+
+
+def iter_batches(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def iter_dataset_files(dataset_dir: Path) -> Iterator[str]:
+    """Lista os pr_*.json sob demanda, sem montar a lista inteira em memória."""
+    with os.scandir(dataset_dir) as entries:
+        for entry in entries:
+            if entry.name.startswith("pr_") and entry.name.endswith(".json") and entry.is_file():
+                yield entry.path
+
+
+def aggregate_datasets(
+    dataset_dir: str,
+    output_dir: str = ".",
+    workers: Optional[int] = None,
+    batch_size: int = ARQUIVOS_POR_TAREFA,
+    janela: int = 0,
+    equivalencia: bool = False,
+) -> DatasetAggregate:
+    """
+    Agrega as estatísticas de todos os pr_*.json de um diretório.
+
+    Se o diretório for um DatasetStore (ver utils.dataset_store), os registros
+    são lidos dos segmentos em sequência e só o parse vai para o pool.
+
+    Os arquivos são lidos em um pool de processos e reduzidos em uma única
+    passada: cada PR vira uma linha de `por_pr.csv` assim que termina e só os
+    totais e histogramas ficam em memória. No fim são escritos `agregado.json`
+    e `histogramas.csv`.
+
+    Args:
+        dataset_dir: Diretório com os arquivos pr_*.json ou um DatasetStore
+        output_dir: Onde escrever os arquivos de saída
+        workers: Processos no pool (padrão: número de CPUs)
+        batch_size: Arquivos por tarefa enviada ao pool
+        janela: Distância máxima em linhas entre achados pareados
+        equivalencia: Só parear achados do mesmo tipo de smell
+
+    Returns:
+        O agregado de todos os PRs
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    aggregate = DatasetAggregate()
+    workers = workers or os.cpu_count() or 1
+
+    with open(output_path / "por_pr.csv", "w", newline="") as f, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        writer = csv.DictWriter(f, fieldnames=COLUNAS_POR_PR, extrasaction="ignore")
+        writer.writeheader()
+
+        def reduce(done) -> None:
+            for future in done:
+                for stats in future.result():
+                    aggregate.add(stats)
+                    if "erro" not in stats:
+                        writer.writerow({**stats, "ground_truth": ";".join(stats["ground_truth"])})
+
+        # Janela limitada de tarefas para não enfileirar o diretório inteiro de uma vez
+        if is_store(dataset_dir):
+            items, task = DatasetStore(dataset_dir).scan_raw(), record_statistics_batch
+        else:
+            items, task = iter_dataset_files(Path(dataset_dir)), pr_statistics_batch
+        pending = set()
+        for batch in iter_batches(items, batch_size):
+            pending.add(executor.submit(task, batch, janela, equivalencia))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                reduce(done)
+        reduce(pending)
+
+    (output_path / "agregado.json").write_text(
+        json.dumps(aggregate.to_dict(), indent=2, ensure_ascii=False)
+    )
+    with open(output_path / "histogramas.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["histograma", "chave", "contagem"])
+        for nome, contagem in aggregate.histogramas.items():
+            for chave, valor in contagem.most_common():
+                writer.writerow([nome, chave, valor])
+
+    return aggregate
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compara os resultados da LLM e do SonarQube")
+    parser.add_argument("caminho", nargs="?", default="dataset-pr-6",
+                        help="Arquivo pr_N.json ou diretório com datasets")
+    parser.add_argument("--agregado", action="store_true",
+                        help="Agrega todos os PRs do diretório em CSV/JSON em vez de imprimir relatórios")
+    parser.add_argument("--saida", default=".", help="Diretório dos arquivos do modo agregado")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processos usados no modo agregado (padrão: número de CPUs)")
+    parser.add_argument("--janela", type=int, default=0,
+                        help="Pareia achados da LLM e do SonarQube a até N linhas de distância")
+    parser.add_argument("--equivalencia", action="store_true",
+                        help="Só pareia achados cujo tipo de smell corresponde à regra do SonarQube")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    import sys
+    args = parse_args()
     
-    if len(sys.argv) > 1:
+    if args.agregado:
+        if not Path(args.caminho).is_dir():
+            sys.exit(f"❌ Diretório {args.caminho} não encontrado")
+        aggregate = aggregate_datasets(
+            args.caminho, args.saida, args.workers, janela=args.janela, equivalencia=args.equivalencia
+        )
+        print(f"✓ {aggregate.prs} PR(s) agregados, {len(aggregate.erros)} arquivo(s) com erro")
+        print(f"✓ Resultados em {Path(args.saida) / 'por_pr.csv'}, "
+              f"{Path(args.saida) / 'agregado.json'} e {Path(args.saida) / 'histogramas.csv'}")
+    elif Path(args.caminho).is_file():
         # Analisa arquivo específico
-        analyze_dataset(sys.argv[1])
+        analyze_dataset(args.caminho, janela=args.janela, equivalencia=args.equivalencia)
     else:
         # Analisa todos os datasets
-        compare_multiple_datasets()
+        compare_multiple_datasets(args.caminho, args.janela, args.equivalencia)
@@ -0,0 +1,277 @@
+"""
+Review many diffs in one process, e.g. to build the research dataset from historical PRs.
+
+Input is either a directory of diff files or a manifest: a text file with one
+diff path per line, or a JSONL file with {"id": ..., "diff": ...} objects.
+Reviews run with bounded concurrency under client-side request/token rate
+limits, and failed requests are retried with exponential backoff. Every result
+is appended to the output JSONL as soon as it finishes. Re-running the same
+command skips diffs that already have a successful result, so an interrupted
+batch resumes where it stopped.
+
+With --pack-prs, small diffs are reviewed several at a time in one multi-PR
+request (see llm.multi_pr) and the answer is split back into one result per
+diff. With --outputs, every result is also written as <dir>/<id>/llm_smells.json
+and review.md, the files generate_review.py produces for a single PR; ids that
+are not plain relative paths get a sanitized, hashed directory name.
+
+Usage: python batch_review.py <diff_dir_or_manifest> [-o results.jsonl] [--workers N]
+                              [--pack-prs N] [--outputs DIR]
+"""
+import argparse
+import hashlib
+import json
+import math
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from pathlib import Path, PurePosixPath
+from typing import Iterator, Optional
+
+from utils import read_diff
+from llm.config import get_model
+from llm.models import CodeReviewResponse
+from llm.multi_pr import multi_pr_input_tokens, review_pr_batch
+from llm.packing import iter_pr_batches
+from llm.pipeline import review_diff_file
+from llm.ratelimit import configure_rate_limits
+from llm.resilience import get_serving_log
+from llm.tokens import CHARS_PER_TOKEN
+from llm.tracing import get_trace
+
+DIFF_SUFFIXES = (".diff", ".patch")
+
+SAFE_NAME_RE = re.compile(r"[\w.-]+")
+
+# Diffs above this many tokens are not worth packing: the prompt is a small share of them
+DEFAULT_PACK_PR_TOKENS = 2000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Review a directory or manifest of diff files')
+    parser.add_argument('source', help='Directory of .diff/.patch files or a manifest file')
+    parser.add_argument('-o', '--output', default='batch_results.jsonl',
+                        help='JSONL file results are appended to (also used to resume)')
+    parser.add_argument('--workers', type=int, default=4, help='Diffs reviewed concurrently')
+    parser.add_argument('--rpm', type=int, default=None, help='Maximum LLM requests per minute')
+    parser.add_argument('--tpm', type=int, default=None, help='Maximum prompt tokens per minute')
+    parser.add_argument('--pack', action='store_true',
+                        help='Pack hunks into the fewest requests that fit the model token budget')
+    parser.add_argument('--prefilter', action='store_true',
+                        help='Run fast local detectors first and only send uncovered hunks to the LLM')
+    parser.add_argument('--pack-prs', type=int, default=0, metavar='N',
+                        help='Review up to N small diffs per request (multi-PR packing)')
+    parser.add_argument('--pack-pr-tokens', type=int, default=DEFAULT_PACK_PR_TOKENS, metavar='TOKENS',
+                        help='Largest diff, in estimated tokens, that --pack-prs packs with others')
+    parser.add_argument('--outputs', default=None, metavar='DIR',
+                        help='Also write llm_smells.json and review.md of every diff to DIR/<id>/')
+    args = parser.parse_args()
+    if args.pack_prs > 1 and args.prefilter:
+        parser.error('--pack-prs cannot be combined with --prefilter')
+    return args
+
+
+def iter_jobs(source: Path) -> Iterator[tuple[str, Path]]:
+    """Yield (job id, diff path) pairs from a directory or a manifest."""
+    if source.is_dir():
+        for path in sorted(source.rglob("*")):
+            if path.suffix in DIFF_SUFFIXES and path.is_file():
+                yield str(path.relative_to(source)), path
+        return
+
+    with open(source) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                entry = json.loads(line)
+                path = source.parent / entry["diff"]
+                yield str(entry.get("id", entry["diff"])), path
+            else:
+                yield line, source.parent / line
+
+
+def load_completed(output: Path) -> set[str]:
+    """Ids that already have a successful result in the output file."""
+    completed = set()
+    if not output.exists():
+        return completed
+    with open(output) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write can leave a truncated last line
+                continue
+            if record.get("status") == "ok":
+                completed.add(record["id"])
+    return completed
+
+
+def plan_jobs(
+    jobs: Iterator[tuple[str, Path]], pack_prs: int, max_pr_tokens: int
+) -> Iterator[list[tuple[str, Path]]]:
+    """Group small diffs into multi-PR requests; without packing every job is on its own."""
+    if pack_prs < 2:
+        for job in jobs:
+            yield [job]
+        return
+
+    paths: dict[str, Path] = {}
+
+    def sizes() -> Iterator[tuple[str, int]]:
+        for job_id, path in jobs:
+            paths[job_id] = path
+            try:
+                # The file size is a good enough estimate and spares reading every diff twice
+                tokens = math.ceil(path.stat().st_size / CHARS_PER_TOKEN)
+            except OSError:
+                # Reviewed alone, so review_job reports the error
+                tokens = sys.maxsize
+            yield job_id, tokens
+
+    limit = multi_pr_input_tokens(get_model())
+    for batch in iter_pr_batches(sizes(), limit, pack_prs, max_pr_tokens):
+        yield [(job_id, paths.pop(job_id)) for job_id in batch]
+
+
+def job_record(
+    job_id: str,
+    path: Path,
+    start: float,
+    response: Optional[CodeReviewResponse] = None,
+    error: Optional[Exception] = None,
+) -> dict:
+    record = {"id": job_id, "diff": str(path)}
+    if error is not None:
+        record.update(status="error", error=f"{type(error).__name__}: {error}")
+    else:
+        record.update(
+            status="ok",
+            smells=[smell.model_dump() for smell in response.smells],
+            pr_comment=response.pr_comment,
+        )
+    record["elapsed"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def review_job(job_id: str, path: Path, pack: bool, prefilter: bool) -> dict:
+    start = time.perf_counter()
+    try:
+        response = review_diff_file(path, pack=pack, prefilter=prefilter)
+    except Exception as e:
+        return job_record(job_id, path, start, error=e)
+    return job_record(job_id, path, start, response)
+
+
+def review_batch(jobs: list[tuple[str, Path]], pack: bool, prefilter: bool) -> list[dict]:
+    """Review the jobs of one plan_jobs batch; elapsed is the time of the whole batch."""
+    if len(jobs) == 1:
+        return [review_job(*jobs[0], pack, prefilter)]
+
+    start = time.perf_counter()
+    records = []
+    diffs = []
+    for job_id, path in jobs:
+        try:
+            diffs.append((job_id, read_diff(path)))
+        except (OSError, UnicodeDecodeError) as e:
+            records.append(job_record(job_id, path, start, error=e))
+
+    paths = dict(jobs)
+    try:
+        reviews, served = review_pr_batch(diffs) if diffs else ({}, {})
+    except Exception as e:
+        return records + [job_record(job_id, paths[job_id], start, error=e) for job_id, _ in diffs]
+    batch_size = sum(1 for path in served.values() if path == "batch")
+    for job_id, response in reviews.items():
+        record = job_record(job_id, paths[job_id], start, response)
+        if served[job_id] == "batch":
+            record["batch_size"] = batch_size
+        elif served[job_id] == "fallback":
+            record["fallback"] = True
+        records.append(record)
+    return records
+
+
+def output_dir(directory: Path, job_id: str) -> Path:
+    """
+    Where the outputs of a job go: DIR/<id> when the id is a plain relative path.
+
+    Other ids (absolute, with `..`, unusual characters or redundant slashes)
+    get a sanitized name plus a hash of the id, so distinct ids never share a
+    directory and overwrite each other's files.
+    """
+    path = PurePosixPath(job_id)
+    if (
+        str(path) == job_id
+        and path.parts
+        and not path.is_absolute()
+        and all(SAFE_NAME_RE.fullmatch(part) and part not in (".", "..") for part in path.parts)
+    ):
+        return directory.joinpath(*path.parts)
+    digest = hashlib.sha256(job_id.encode()).hexdigest()[:12]
+    name = re.sub(r"[^\w.-]+", "_", job_id).strip("._")
+    return directory / f"{name}-{digest}"
+
+
+def write_outputs(directory: Path, record: dict) -> None:
+    """Write the llm_smells.json and review.md of a successful result, like generate_review.py."""
+    pr_dir = output_dir(directory, record["id"])
+    pr_dir.mkdir(parents=True, exist_ok=True)
+    (pr_dir / "review.md").write_text(record["pr_comment"])
+    (pr_dir / "llm_smells.json").write_text(json.dumps(record["smells"], indent=2))
+
+
+def main():
+    args = parse_args()
+    source = Path(args.source)
+    output = Path(args.output)
+
+    configure_rate_limits(args.rpm, args.tpm)
+
+    completed = load_completed(output)
+    jobs = ((job_id, path) for job_id, path in iter_jobs(source) if job_id not in completed)
+    batches = plan_jobs(jobs, args.pack_prs, args.pack_pr_tokens)
+    outputs = Path(args.outputs) if args.outputs else None
+
+    done = failed = 0
+    with open(output, "a") as out, ThreadPoolExecutor(max_workers=args.workers) as executor:
+        def write(records: list[dict]):
+            nonlocal done, failed
+            for record in records:
+                if outputs and record["status"] == "ok":
+                    write_outputs(outputs, record)
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                if record["status"] == "ok":
+                    done += 1
+                else:
+                    failed += 1
+                print(f"[{done + failed}] {record['status']:<5} {record['id']} ({record['elapsed']}s)",
+                      file=sys.stderr)
+
+        # Keep a bounded window of submitted batches so huge manifests are not queued up front
+        pending = set()
+        for batch in batches:
+            pending.add(executor.submit(review_batch, batch, args.pack, args.prefilter))
+            if len(pending) >= args.workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    write(future.result())
+        for future in as_completed(pending):
+            write(future.result())
+
+    print(f"✓ Reviewed {done} diff(s), {failed} failed, {len(completed)} already done")
+    print(f"✓ Results appended to {output}")
+    if args.pack_prs > 1:
+        counters = get_trace().counters
+        print(f"✓ {counters['pr_batches']} multi-PR request(s), "
+              f"{counters['pr_batch_fallbacks']} retried as single requests")
+    print(f"✓ {get_serving_log()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Sequential per-PR reports versus the parallel aggregate mode of analyze_results.
+
+Writes --prs synthetic pr_*.json dataset files (or uses an existing dataset
+directory) and times compare_multiple_datasets, with its console output
+discarded, against aggregate_datasets at several pool sizes.
+
+Usage: python tool/benchmarks/aggregate_analysis.py [dataset_dir] [--prs N] [--smells N]
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analyze_results import aggregate_datasets, compare_multiple_datasets  # noqa: E402
+
+SMELL_TYPES = ["TODO_COMMENT", "UNUSED_IMPORT", "LONG_METHOD", "MAGIC_NUMBER", "DUPLICATE_CODE"]
+SEVERITIES = ["INFO", "MINOR", "MAJOR", "CRITICAL"]
+RULES = ["python:S1135", "python:S1481", "python:S3776", "python:S109", "python:S1192"]
+
+
+def write_synthetic_datasets(directory: Path, prs: int, smells: int) -> None:
+    rng = random.Random(0)
+    for number in range(1, prs + 1):
+        files = [f"src/module_{i}.py" for i in range(5)]
+        data = {
+            "pr_number": number,
+            "pr_author": f"author{number % 17}",
+            "created_at": "2025-01-01T00:00:00Z",
+            "ground_truth_smells": rng.sample(SMELL_TYPES, 2),
+            "llm_smells": [
+                {
+                    "file": rng.choice(files), "line": rng.randint(1, 200),
+                    "smell_type": rng.choice(SMELL_TYPES), "severity": rng.choice(SEVERITIES),
+                    "message": "Synthetic finding " * 5,
+                }
+                for _ in range(smells)
+            ],
+            "sonar_issues": [
+                {
+                    "component": f"project:{rng.choice(files)}", "line": rng.randint(1, 200),
+                    "rule": rng.choice(RULES), "severity": rng.choice(SEVERITIES),
+                    "message": "Synthetic issue " * 5,
+                }
+                for _ in range(smells)
+            ],
+        }
+        (directory / f"pr_{number}.json").write_text(json.dumps(data, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the aggregate dataset analysis")
+    parser.add_argument("dataset_dir", nargs="?", help="Existing directory of pr_*.json files")
+    parser.add_argument("--prs", type=int, default=2000)
+    parser.add_argument("--smells", type=int, default=30, help="LLM smells and Sonar issues per PR")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset_dir = Path(args.dataset_dir) if args.dataset_dir else Path(tmp) / "dataset"
+        if not args.dataset_dir:
+            dataset_dir.mkdir()
+            write_synthetic_datasets(dataset_dir, args.prs, args.smells)
+        count = sum(1 for _ in dataset_dir.glob("pr_*.json"))
+        print(f"{count} dataset file(s) in {dataset_dir}")
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            compare_multiple_datasets(str(dataset_dir))
+        print(f"{'sequential reports':<22} {time.perf_counter() - start:8.3f}s")
+
+        for workers in args.workers:
+            start = time.perf_counter()
+            aggregate_datasets(str(dataset_dir), str(Path(tmp) / f"out_{workers}"), workers)
+            print(f"{f'aggregate x{workers}':<22} {time.perf_counter() - start:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Throughput of the local pre-filter detectors, in added lines per second.
+
+Builds a synthetic diff of new Python files mixing imports, TODO comments and
+code (or uses the given diff) and runs every detector over it.
+
+Usage: python tool/benchmarks/detectors.py [diff_file] [--files N] [--runs N]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from detectors import run_detectors  # noqa: E402
+from utils.diff_parser import group_hunks, iter_hunks, parse_lines  # noqa: E402
+
+FILE_BODY = [
+    "import os",
+    "import json",
+    "import numpy as np",
+    "from typing import Optional",
+    "",
+    "# TODO remove once the new parser lands",
+    "def load(path: str) -> Optional[dict]:",
+    "    if not os.path.exists(path):",
+    "        return None",
+    "    with open(path) as f:",
+    "        return json.load(f)",
+    "",
+    "def scale(values):",
+    "    # FIXME handle empty input",
+    "    return [v * 2 for v in values]",
+]
+
+
+def synthetic_diff(files: int) -> list[str]:
+    lines = []
+    for index in range(files):
+        name = f"pkg/module_{index}.py"
+        lines += [
+            f"diff --git a/{name} b/{name}",
+            "new file mode 100644",
+            "index 0000000..1111111",
+            "--- /dev/null",
+            f"+++ b/{name}",
+            f"@@ -0,0 +1,{len(FILE_BODY)} @@",
+        ]
+        lines += [f"+{line}" for line in FILE_BODY]
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local smell detectors")
+    parser.add_argument("diff_file", nargs="?")
+    parser.add_argument("--files", type=int, default=2000, help="Files in the synthetic diff")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--repo-root", default=None)
+    args = parser.parse_args()
+
+    if args.diff_file:
+        hunks = list(iter_hunks(args.diff_file))
+    else:
+        hunks = list(group_hunks(parse_lines(synthetic_diff(args.files))))
+    added = sum(len(hunk.added_lines()) for hunk in hunks)
+
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        result = run_detectors(hunks, args.repo_root)
+        timings.append(time.perf_counter() - start)
+
+    median = statistics.median(timings)
+    print(f"{len(hunks)} hunk(s), {added} added line(s), {len(result.smells)} smell(s), "
+          f"{len(result.covered)} hunk(s) fully covered")
+    print(f"median {median * 1000:.1f} ms  ->  {added / median:,.0f} lines/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Memory and throughput benchmark for the streaming diff parser.
+
+Generates a synthetic multi-file diff (or uses the given one) and compares the
+peak Python heap of read_diff + split_diff against iter_hunks on the same file.
+
+Usage: python tool/benchmarks/diff_parser.py [diff_file] [--size-mb N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import iter_hunks, read_diff, split_diff  # noqa: E402
+
+
+def write_synthetic_diff(path: Path, size_mb: int) -> None:
+    target = size_mb * 1024 * 1024
+    written = 0
+    file_index = 0
+    with open(path, "w") as f:
+        while written < target:
+            name = f"vendor/generated_{file_index}.py"
+            lines = [
+                f"diff --git a/{name} b/{name}\n",
+                "index 0000000..1111111 100644\n",
+                f"--- a/{name}\n",
+                f"+++ b/{name}\n",
+            ]
+            for hunk in range(20):
+                start = hunk * 100 + 1
+                lines.append(f"@@ -{start},10 +{start},10 @@\n")
+                for i in range(10):
+                    lines.append(f"-value_{file_index}_{hunk}_{i} = {i}\n")
+                for i in range(10):
+                    lines.append(f"+value_{file_index}_{hunk}_{i} = {i} * 2\n")
+            chunk = "".join(lines)
+            f.write(chunk)
+            written += len(chunk)
+            file_index += 1
+
+
+def measure(label: str, fn) -> None:
+    # Time and memory are measured in separate runs: tracemalloc slows parsing down a lot
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {count:>9} hunks  {elapsed:7.2f}s  peak {peak / 1024 / 1024:8.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming diff parser")
+    parser.add_argument("diff_file", nargs="?")
+    parser.add_argument("--size-mb", type=int, default=50, help="Size of the synthetic diff")
+    args = parser.parse_args()
+
+    tmp_path = None
+    diff_file = args.diff_file
+    if diff_file is None:
+        fd, tmp_path = tempfile.mkstemp(suffix=".diff")
+        os.close(fd)
+        write_synthetic_diff(Path(tmp_path), args.size_mb)
+        diff_file = tmp_path
+
+    try:
+        size = os.path.getsize(diff_file) / 1024 / 1024
+        print(f"diff: {diff_file} ({size:.1f} MiB)")
+        measure("read_diff + split_diff", lambda: len(split_diff(read_diff(diff_file))))
+        measure("iter_hunks (streaming)", lambda: sum(1 for _ in iter_hunks(diff_file)))
+    finally:
+        if tmp_path:
+            os.unlink(tmp_path)
+
+
+if __name__ == "__main__":
+    main()
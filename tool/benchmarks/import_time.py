@@ -0,0 +1,66 @@
+"""
+Startup-time benchmark for the tool entry points.
+
+Runs each entry point import in a fresh interpreter with `python -X importtime`
+and reports the cumulative import time plus the heaviest imports.
+
+Usage: python tool/benchmarks/import_time.py [--repeat N] [--top N]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+TOOL_DIR = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = ["main", "generate_review", "build_log", "analyze_results", "llm", "utils"]
+
+
+def measure_import(module: str) -> tuple[int, list[tuple[int, str]]]:
+    """Import `module` in a subprocess and return (total_us, [(cumulative_us, name), ...])."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=TOOL_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        last_line = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else ""
+        raise RuntimeError(f"import {module} failed: {last_line}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative), name.strip()))
+
+    total = next((us for us, name in reversed(imports) if name == module), 0)
+    return total, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time of the tool entry points")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per entry point")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest imports to list")
+    args = parser.parse_args()
+
+    for module in ENTRY_POINTS:
+        try:
+            runs = [measure_import(module) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{module:<16} error: {e}")
+            continue
+
+        totals = [total for total, _ in runs]
+        print(f"{module:<16} median {statistics.median(totals) / 1000:8.1f} ms"
+              f"  min {min(totals) / 1000:8.1f} ms")
+
+        heaviest = sorted(runs[-1][1], reverse=True)
+        for cumulative, name in [item for item in heaviest if item[1] != module][:args.top]:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Sort-merge matching of LLM smells and SonarQube issues versus a pairwise scan.
+
+Generates N findings per tool spread over --files files and matches them with
+utils.matching.match_findings and with a naive pairwise greedy matcher.
+
+Usage: python tool/benchmarks/matching.py [--findings N ...] [--files N] [--window K]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.matching import match_findings, sonar_path  # noqa: E402
+
+
+def pairwise(llm: list[dict], sonar: list[dict], window: int) -> int:
+    used = set()
+    matches = 0
+    for smell in llm:
+        for index, issue in enumerate(sonar):
+            if index not in used and sonar_path(issue) == smell["file"] \
+                    and abs(issue["line"] - smell["line"]) <= window:
+                used.add(index)
+                matches += 1
+                break
+    return matches
+
+
+def synthetic(count: int, files: int, rng: random.Random) -> tuple[list[dict], list[dict]]:
+    llm = [{"file": f"f{rng.randrange(files)}.py", "line": rng.randint(1, 2000), "smell_type": "LONG_METHOD"}
+           for _ in range(count)]
+    sonar = [{"component": f"p:f{rng.randrange(files)}.py", "line": rng.randint(1, 2000), "rule": "python:S138"}
+             for _ in range(count)]
+    return llm, sonar
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the smell matcher")
+    parser.add_argument("--findings", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--window", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for count in args.findings:
+        llm, sonar = synthetic(count, args.files, rng)
+        start = time.perf_counter()
+        result = match_findings(llm, sonar, args.window)
+        merge_time = time.perf_counter() - start
+        start = time.perf_counter()
+        naive = pairwise(llm, sonar, args.window)
+        pairwise_time = time.perf_counter() - start
+        print(f"{count:>7} finding(s)  sort-merge {merge_time:7.3f}s ({len(result.matches)} matches)"
+              f"  pairwise {pairwise_time:7.3f}s ({naive} matches)")
+
+
+if __name__ == "__main__":
+    main()
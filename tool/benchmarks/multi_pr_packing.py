@@ -0,0 +1,81 @@
+"""
+Requests, prompt tokens and wall time of one request per PR vs. multi-PR packing.
+
+Reviews --prs small synthetic diffs (or the diffs of a directory) against the
+stub backend, once with a request per PR and once packed --pack-prs at a
+time as batch_review.py --pack-prs does. Every request waits --latency
+seconds, so the wall time shows the saved round trips. The response cache is
+disabled so every review reaches the backend.
+
+Usage: python tool/benchmarks/multi_pr_packing.py [diff_dir] [--prs N] [--pack-prs N]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["REVIEW_CACHE"] = "0"
+
+from llm.backends import StubBackend, configure_backend  # noqa: E402
+from llm.config import get_model  # noqa: E402
+from llm.main import generate_response  # noqa: E402
+from llm.multi_pr import multi_pr_input_tokens, review_pr_batch  # noqa: E402
+from llm.packing import iter_pr_batches  # noqa: E402
+from llm.tokens import estimate_tokens  # noqa: E402
+from llm.tracing import start_trace  # noqa: E402
+from utils import read_diff  # noqa: E402
+
+
+def synthetic_diff(number: int) -> str:
+    lines = [f"+def handler_{number}_{i}(value):  # TODO validate\n+    return value * {i + 2}\n" for i in range(3)]
+    return (
+        f"diff --git a/app/module_{number}.py b/app/module_{number}.py\n"
+        f"--- a/app/module_{number}.py\n+++ b/app/module_{number}.py\n"
+        f"@@ -1,0 +1,{2 * len(lines)} @@\n{''.join(lines)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-PR request packing against a stub LLM")
+    parser.add_argument("diff_dir", nargs="?", help="Directory of .diff/.patch files, one per PR")
+    parser.add_argument("--prs", type=int, default=200)
+    parser.add_argument("--pack-prs", type=int, default=8, help="Most PRs per packed request")
+    parser.add_argument("--pack-pr-tokens", type=int, default=2000, help="Largest diff that is packed")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub latency per request (s)")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.diff_dir:
+        paths = sorted(p for p in Path(args.diff_dir).iterdir() if p.suffix in (".diff", ".patch"))
+        diffs = [(p.name, read_diff(p)) for p in paths]
+    else:
+        diffs = [(f"pr_{n}", synthetic_diff(n)) for n in range(1, args.prs + 1)]
+    model = get_model()
+    contents = dict(diffs)
+    sizes = [(pr_id, estimate_tokens(diff, model)) for pr_id, diff in diffs]
+    batches = list(iter_pr_batches(sizes, multi_pr_input_tokens(model), args.pack_prs, args.pack_pr_tokens))
+    print(f"{len(diffs)} PR(s), {len(batches)} packed request(s) of up to {args.pack_prs}")
+
+    packed = [[(pr_id, contents[pr_id]) for pr_id in batch] for batch in batches]
+    runs = (
+        ("one per PR", lambda executor: list(executor.map(generate_response, contents.values()))),
+        ("packed", lambda executor: list(executor.map(review_pr_batch, packed))),
+    )
+    for label, run in runs:
+        stub = StubBackend(args.latency)
+        configure_backend(stub)
+        trace = start_trace()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.workers) as executor:
+            run(executor)
+        elapsed = time.perf_counter() - start
+        summary = trace.to_dict()
+        print(f"{label:<12} {stub.calls:>6} request(s)  {summary['prompt_tokens']:>9} prompt token(s)"
+              f"  {summary['completion_tokens']:>8} completion token(s)  {elapsed:7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
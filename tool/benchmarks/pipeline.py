@@ -0,0 +1,73 @@
+"""
+End-to-end throughput and latency benchmark of the review pipeline, fully offline.
+
+Reviews run against llm.backends.StubBackend, either in-process or through the
+localhost HTTP stub server (--server) to include the OpenAI client and network
+stack. The response cache is disabled so every run reaches the backend.
+
+Usage: python tool/benchmarks/pipeline.py [diff_file] [--latency S] [--runs N] [--server]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["REVIEW_CACHE"] = "0"
+
+from llm.backends import OpenAIBackend, StubBackend, configure_backend  # noqa: E402
+from llm.pipeline import review_diff_file  # noqa: E402
+from llm.stub_server import start_stub_server  # noqa: E402
+
+MODES = {
+    "single": {"workers": 1, "pack": False},
+    "parallel x4": {"workers": 4, "pack": False},
+    "parallel x16": {"workers": 16, "pack": False},
+    "packed x4": {"workers": 4, "pack": True},
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    default_diff = Path(__file__).resolve().parent.parent / "examples" / "sample_diff.diff"
+    parser = argparse.ArgumentParser(description="Benchmark the review pipeline against a stub LLM")
+    parser.add_argument("diff_file", nargs="?", default=str(default_diff))
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub latency per request (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Stub latency jitter (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of injected 5xx errors")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--server", action="store_true", help="Go through the HTTP stub server")
+    args = parser.parse_args()
+
+    stub = StubBackend(args.latency, args.jitter, args.error_rate, seed=0)
+    if args.server:
+        server = start_stub_server(stub)
+        configure_backend(OpenAIBackend(f"http://127.0.0.1:{server.server_port}/v1", api_key="stub"))
+    else:
+        configure_backend(stub)
+
+    print(f"diff {args.diff_file}, stub latency {args.latency}s, "
+          f"{'HTTP server' if args.server else 'in-process'}")
+    # Warm-up: imports and client construction should not count against the first mode
+    review_diff_file(args.diff_file)
+
+    for mode, options in MODES.items():
+        calls_before = stub.calls
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            review_diff_file(args.diff_file, **options)
+            timings.append(time.perf_counter() - start)
+        requests = (stub.calls - calls_before) / args.runs
+        print(f"{mode:<14} p50 {statistics.median(timings):7.3f}s  p95 {percentile(timings, 0.95):7.3f}s"
+              f"  {requests:6.1f} request(s)/review  {args.runs / sum(timings):7.2f} reviews/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Compare the number of requests and estimated tokens of per-hunk review vs. packed requests.
+
+Every request pays for the system prompt, so packing hunks under the model
+budget cuts both round trips and prompt tokens.
+
+Usage: python tool/benchmarks/request_packing.py <diff_file> [--model NAME]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm.config import get_model  # noqa: E402
+from llm.packing import pack_hunks  # noqa: E402
+from llm.tokens import estimate_tokens, get_budget  # noqa: E402
+from utils import iter_hunks  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark token-budgeted request packing")
+    parser.add_argument("diff_file")
+    parser.add_argument("--model", default=None)
+    args = parser.parse_args()
+
+    model = args.model or get_model()
+    budget = get_budget(model)
+
+    hunks = list(iter_hunks(args.diff_file))
+    per_hunk_tokens = sum(estimate_tokens(h.text(), model) + budget.prompt_tokens for h in hunks)
+
+    plan = pack_hunks(hunks, budget, model)
+    packed_tokens = sum(p.tokens + budget.prompt_tokens for p in plan.packs)
+
+    print(f"model {model}: context {budget.context_tokens}, output {budget.output_tokens},"
+          f" prompt ~{budget.prompt_tokens}")
+    print(f"per-hunk: {len(hunks):>6} request(s)  ~{per_hunk_tokens:>10} input tokens")
+    print(f"packed:   {len(plan.packs):>6} request(s)  ~{packed_tokens:>10} input tokens"
+          f"  ({len(plan.skipped)} file(s)/hunk(s) skipped)")
+
+
+if __name__ == "__main__":
+    main()
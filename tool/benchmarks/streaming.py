@@ -0,0 +1,79 @@
+"""
+Time to first finding with and without streaming, fully offline.
+
+The blocking path only has results once the whole response is in; the
+streaming path hands over each smell as soon as its JSON object is complete.
+Reviews run against llm.backends.StubBackend, in-process or through the
+localhost HTTP stub server (--server), with the response cache disabled.
+
+Usage: python tool/benchmarks/streaming.py [diff_file] [--latency S] [--runs N] [--server]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["REVIEW_CACHE"] = "0"
+
+from llm.backends import OpenAIBackend, StubBackend, configure_backend  # noqa: E402
+from llm.main import generate_response  # noqa: E402
+from llm.streaming import stream_response  # noqa: E402
+from llm.stub_server import start_stub_server  # noqa: E402
+from utils import read_diff  # noqa: E402
+
+
+def time_blocking(diff: str) -> tuple[float, float]:
+    start = time.perf_counter()
+    generate_response(diff)
+    total = time.perf_counter() - start
+    return total, total
+
+
+def time_streaming(diff: str) -> tuple[float, float]:
+    first: list[float] = []
+    start = time.perf_counter()
+
+    def on_smell(_):
+        if not first:
+            first.append(time.perf_counter() - start)
+
+    stream_response(diff, on_smell, lambda _: None)
+    total = time.perf_counter() - start
+    return (first[0] if first else total), total
+
+
+def main():
+    default_diff = Path(__file__).resolve().parent.parent / "examples" / "sample_diff.diff"
+    parser = argparse.ArgumentParser(description="Benchmark time to first smell with streaming")
+    parser.add_argument("diff_file", nargs="?", default=str(default_diff))
+    parser.add_argument("--latency", type=float, default=2.0, help="Stub generation time per request (s)")
+    parser.add_argument("--ttft-share", type=float, default=0.1,
+                        help="Share of the latency spent before the first token")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--server", action="store_true", help="Go through the HTTP stub server")
+    args = parser.parse_args()
+
+    stub = StubBackend(args.latency, ttft_share=args.ttft_share, seed=0)
+    if args.server:
+        server = start_stub_server(stub)
+        configure_backend(OpenAIBackend(f"http://127.0.0.1:{server.server_port}/v1", api_key="stub"))
+    else:
+        configure_backend(stub)
+
+    diff = read_diff(args.diff_file)
+    print(f"diff {args.diff_file}, stub latency {args.latency}s, "
+          f"{'HTTP server' if args.server else 'in-process'}")
+    # Warm-up: imports and client construction should not count against the first mode
+    generate_response(diff)
+
+    for mode, run in (("blocking", time_blocking), ("streaming", time_streaming)):
+        firsts, totals = zip(*(run(diff) for _ in range(args.runs)))
+        print(f"{mode:<10} first smell p50 {statistics.median(firsts):7.3f}s"
+              f"  complete p50 {statistics.median(totals):7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
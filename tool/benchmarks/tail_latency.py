@@ -0,0 +1,53 @@
+"""
+Tail latency of single-request reviews with and without hedging, fully offline.
+
+The stub backend answers most requests after --latency seconds but a share
+--slow-rate of them only after --slow-latency seconds. With hedging a duplicate
+request is sent after --hedge-after seconds and the first answer wins. The
+response cache is disabled so every review reaches the backend.
+
+Usage: python tool/benchmarks/tail_latency.py [diff_file] [--reviews N] [--slow-rate R]
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["REVIEW_CACHE"] = "0"
+
+from llm.backends import StubBackend, configure_backend  # noqa: E402
+from llm.main import generate_response  # noqa: E402
+from llm.resilience import get_serving_log  # noqa: E402
+from utils import read_diff  # noqa: E402
+
+
+def main():
+    default_diff = Path(__file__).resolve().parent.parent / "examples" / "sample_diff.diff"
+    parser = argparse.ArgumentParser(description="Benchmark hedged requests against a stub LLM")
+    parser.add_argument("diff_file", nargs="?", default=str(default_diff))
+    parser.add_argument("--reviews", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="Usual stub latency (s)")
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="Share of slow requests")
+    parser.add_argument("--slow-latency", type=float, default=2.0, help="Latency of slow requests (s)")
+    parser.add_argument("--hedge-after", type=float, default=0.2, help="Seconds before the duplicate")
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    diff = read_diff(args.diff_file)
+    print(f"{args.reviews} review(s), {args.slow_rate:.0%} take {args.slow_latency}s instead of {args.latency}s")
+    for label, hedge_after in (("no hedging", "0"), (f"hedge after {args.hedge_after}s", str(args.hedge_after))):
+        os.environ["REVIEW_HEDGE_AFTER"] = hedge_after
+        stub = StubBackend(args.latency, slow_rate=args.slow_rate, slow_latency=args.slow_latency, seed=0)
+        configure_backend(stub)
+        log = get_serving_log()
+        log.records.clear()
+        # Distinct diffs so the stub draws independent latencies for every review
+        with ThreadPoolExecutor(args.workers) as executor:
+            list(executor.map(generate_response, (f"{diff}\n# review {i}\n" for i in range(args.reviews))))
+        print(f"{label:<18} {log}  {stub.calls} backend call(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
+import argparse
 import json
-import sys
 from pathlib import Path
 
+from utils.dataset_store import DatasetStore
+
 def load_sonar(pr_number):
     path = Path(f"sonar_pr_{pr_number}.json")
     return json.loads(path.read_text()) if path.exists() else {}
@@ -28,8 +30,17 @@ def extract_ground_truth(pr_body, labels):
 
     return list(set(smells))
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the dataset entry of a PR")
+    parser.add_argument("event_path", help="GitHub event payload (GITHUB_EVENT_PATH)")
+    parser.add_argument("--store", default=None,
+                        help="Upsert the entry into this DatasetStore instead of writing dataset/pr_<n>.json")
+    parser.add_argument("--compress", action="store_true", help="Gzip records written to the store")
+    return parser.parse_args()
+
 def main():
-    event = json.loads(Path(sys.argv[1]).read_text())
+    args = parse_args()
+    event = json.loads(Path(args.event_path).read_text())
     pr = event["pull_request"]
     pr_number = pr["number"]
 
@@ -47,6 +58,11 @@ def main():
         "sonar_issues": load_sonar(pr_number).get("issues", [])
     }
 
+    if args.store:
+        # Rebuilding a PR appends a new record that supersedes the old one
+        DatasetStore(args.store, compress=args.compress).put(log)
+        return
+
     Path(f"dataset/pr_{pr_number}.json").write_text(
         json.dumps(log, indent=2)
     )
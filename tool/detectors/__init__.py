@@ -0,0 +1,3 @@
+from .main import DETECTORS, DetectionResult, run_detectors
+
+__all__ = ['DETECTORS', 'DetectionResult', 'run_detectors']
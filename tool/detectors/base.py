@@ -0,0 +1,86 @@
+import ast
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from utils.diff_parser import DiffLine, FileHeader, Hunk
+
+_UNSET = object()
+
+
+def used_names(source: str) -> Optional[set[str]]:
+    """Names referenced outside import statements, or None if the source does not parse."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, ast.Attribute):
+            root = node
+            while isinstance(root, ast.Attribute):
+                root = root.value
+            if isinstance(root, ast.Name):
+                names.add(root.id)
+        elif isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == "__all__" for target in node.targets
+        ):
+            # Names re-exported through __all__ count as used
+            for element in getattr(node.value, "elts", []):
+                if isinstance(element, ast.Constant) and isinstance(element.value, str):
+                    names.add(element.value)
+    return names
+
+
+@dataclass
+class FileChanges:
+    """Everything a detector needs to know about one file of the diff."""
+    header: FileHeader
+    hunks: list[Hunk] = field(default_factory=list)
+    root: Optional[Path] = None
+    # Filled on first use, once all hunks are added, and shared by every detector
+    _source: object = field(default=_UNSET, init=False, repr=False, compare=False)
+    _used_names: object = field(default=_UNSET, init=False, repr=False, compare=False)
+
+    @property
+    def path(self) -> str:
+        return self.header.path
+
+    @property
+    def is_new_file(self) -> bool:
+        return self.header.old_path is None
+
+    @property
+    def added(self) -> list[DiffLine]:
+        return [line for hunk in self.hunks for line in hunk.added_lines()]
+
+    def new_source(self) -> Optional[str]:
+        """
+        Full new version of the file, if it can be known.
+
+        Read from the checkout under `root` (the PR head in CI); for files
+        created by the diff the added lines are the whole file. Read once per file.
+        """
+        if self._source is _UNSET:
+            self._source = self._read_source()
+        return self._source
+
+    def _read_source(self) -> Optional[str]:
+        if self.root is not None:
+            path = self.root / self.path
+            try:
+                return path.read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                pass
+        if self.is_new_file:
+            return "\n".join(line.text for line in self.added)
+        return None
+
+    def used_names(self) -> Optional[set[str]]:
+        """used_names of the new source, parsed once per file; None if unknown or unparsable."""
+        if self._used_names is _UNSET:
+            source = self.new_source()
+            self._used_names = None if source is None else used_names(source)
+        return self._used_names
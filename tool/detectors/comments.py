@@ -0,0 +1,24 @@
+import re
+
+from llm.models import CodeSmell
+
+from .base import FileChanges
+
+TODO_RE = re.compile(r"(?:#|//|/\*|<!--|--)\s*(TODO|FIXME|HACK|XXX)\b", re.IGNORECASE)
+
+
+def detect_todo_comments(changes: FileChanges) -> list[CodeSmell]:
+    """Flag TODO/FIXME/HACK/XXX markers on added lines."""
+    smells = []
+    for line in changes.added:
+        match = TODO_RE.search(line.text)
+        if match:
+            marker = match.group(1).upper()
+            smells.append(CodeSmell(
+                file=changes.path,
+                line=line.new_lineno,
+                smell_type="TODO_COMMENT",
+                message=f"{marker} comment left in the code; track the pending work in an issue instead",
+                severity="MINOR",
+            ))
+    return smells
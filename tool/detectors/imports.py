@@ -0,0 +1,145 @@
+import ast
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, Optional
+
+from llm.models import CodeSmell
+from utils.diff_parser import DiffLine
+
+from .base import FileChanges
+
+IMPORT_LINE_RE = re.compile(r"^\s*(import|from)\s+[\w.]")
+REQUIREMENT_NAME_RE = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+# Import names whose PyPI distribution is called something else
+DISTRIBUTION_NAMES = {
+    "bs4": "beautifulsoup4",
+    "cv2": "opencv-python",
+    "dateutil": "python-dateutil",
+    "dotenv": "python-dotenv",
+    "jwt": "pyjwt",
+    "PIL": "pillow",
+    "sklearn": "scikit-learn",
+    "yaml": "pyyaml",
+}
+
+
+def is_import_line(text: str) -> bool:
+    return bool(IMPORT_LINE_RE.match(text))
+
+
+def normalize(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def parse_imports(line: DiffLine) -> Iterator[tuple[str, str]]:
+    """Yield (bound name, top-level module) for an added single-line import."""
+    # Most added lines are not imports: skip them without parsing
+    if not is_import_line(line.text):
+        return
+    try:
+        tree = ast.parse(line.text.strip())
+    except SyntaxError:
+        # Multi-line imports and other fragments are left to the LLM
+        return
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                module = alias.name.split(".")[0]
+                yield alias.asname or module, module
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            module = node.module.split(".")[0]
+            for alias in node.names:
+                if alias.name != "*":
+                    yield alias.asname or alias.name, module
+
+
+def find_requirements(root: Path, file_path: str) -> Optional[Path]:
+    """Closest requirements.txt walking up from the file's directory to the root."""
+    directory = (root / file_path).parent
+    while True:
+        candidate = directory / "requirements.txt"
+        if candidate.is_file():
+            return candidate
+        if directory == root or root not in directory.parents:
+            return None
+        directory = directory.parent
+
+
+@lru_cache(maxsize=None)
+def load_requirements(path: Path) -> frozenset[str]:
+    names = set()
+    for line in path.read_text().splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line or line.startswith("-"):
+            continue
+        match = REQUIREMENT_NAME_RE.match(line)
+        if match:
+            names.add(normalize(match.group(1)))
+    return frozenset(names)
+
+
+def is_local_module(root: Path, file_path: str, module: str) -> bool:
+    for directory in {(root / file_path).parent, root}:
+        if (directory / f"{module}.py").exists() or (directory / module).is_dir():
+            return True
+    return False
+
+
+def can_check_imports(changes: FileChanges) -> bool:
+    """True when detect_unused_imports can analyze the file: Python with a known, parsable new version."""
+    return changes.path.endswith(".py") and changes.used_names() is not None
+
+
+def detect_unused_imports(changes: FileChanges) -> list[CodeSmell]:
+    """Flag added imports never referenced in the new version of a Python file."""
+    if not changes.path.endswith(".py"):
+        return []
+    names = changes.used_names()
+    if names is None:
+        return []
+
+    smells = []
+    for line in changes.added:
+        for bound, _ in parse_imports(line):
+            if bound.split(".")[0] not in names:
+                smells.append(CodeSmell(
+                    file=changes.path,
+                    line=line.new_lineno,
+                    smell_type="UNUSED_IMPORT",
+                    message=f"'{bound}' is imported but never used",
+                    severity="MINOR",
+                ))
+    return smells
+
+
+def detect_missing_requirements(changes: FileChanges) -> list[CodeSmell]:
+    """Flag third-party imports that are not declared in the nearest requirements.txt."""
+    if not changes.path.endswith(".py") or changes.root is None:
+        return []
+    requirements_path = find_requirements(changes.root, changes.path)
+    if requirements_path is None:
+        return []
+    requirements = load_requirements(requirements_path)
+
+    smells = []
+    for line in changes.added:
+        for _, module in parse_imports(line):
+            if module in sys.stdlib_module_names or module == "__future__":
+                continue
+            if is_local_module(changes.root, changes.path, module):
+                continue
+            distribution = DISTRIBUTION_NAMES.get(module, module)
+            if normalize(distribution) in requirements:
+                continue
+            smells.append(CodeSmell(
+                file=changes.path,
+                line=line.new_lineno,
+                smell_type="MISSING_DEPENDENCY",
+                message=f"'{module}' is imported but '{distribution}' is not listed in "
+                        f"{requirements_path.relative_to(changes.root)}",
+                severity="MAJOR",
+            ))
+    return smells
@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Callable, Iterable, Optional, Union
+
+from llm.models import CodeSmell
+from utils.diff_parser import Hunk
+
+from .base import FileChanges
+from .comments import detect_todo_comments
+from .imports import can_check_imports, detect_missing_requirements, detect_unused_imports, is_import_line
+
+Detector = Callable[[FileChanges], list[CodeSmell]]
+
+DETECTORS: list[Detector] = [
+    detect_todo_comments,
+    detect_unused_imports,
+    detect_missing_requirements,
+]
+
+# Line comment markers by file extension; `#` is not one in C and C++ (#include, #define)
+COMMENT_PREFIXES = {
+    ".py": ("#",),
+    ".sh": ("#",),
+    ".rb": ("#",),
+    ".yml": ("#",),
+    ".yaml": ("#",),
+    ".toml": ("#",),
+    ".js": ("//",),
+    ".jsx": ("//",),
+    ".ts": ("//",),
+    ".tsx": ("//",),
+    ".java": ("//",),
+    ".kt": ("//",),
+    ".go": ("//",),
+    ".rs": ("//",),
+    ".cs": ("//",),
+    ".swift": ("//",),
+    ".c": ("//",),
+    ".h": ("//",),
+    ".cc": ("//",),
+    ".cpp": ("//",),
+    ".hpp": ("//",),
+}
+
+
+@dataclass
+class DetectionResult:
+    smells: list[CodeSmell]
+    covered: list[Hunk]
+    remaining: list[Hunk]
+
+
+def comment_prefixes(path: str) -> tuple[str, ...]:
+    """Line comment markers of a file; none for file types we do not know."""
+    return COMMENT_PREFIXES.get(PurePosixPath(path).suffix.lower(), ())
+
+
+def is_trivial_line(text: str, prefixes: tuple[str, ...] = (), imports_checked: bool = False) -> bool:
+    """
+    Lines the local detectors fully account for: blanks, comments and imports.
+
+    Comments are recognized by the `prefixes` of the file type, and import
+    lines only count when the import detectors ran on the file.
+    """
+    stripped = text.strip()
+    return (
+        not stripped
+        or stripped.startswith(prefixes)
+        or (imports_checked and is_import_line(stripped))
+    )
+
+
+def is_covered(hunk: Hunk, prefixes: tuple[str, ...] = (), imports_checked: bool = False) -> bool:
+    """
+    True when a hunk adds lines and the local detectors fully account for all of them.
+
+    Hunks that only delete lines are never covered: removed code, e.g. a
+    dropped guard clause, still needs a review.
+    """
+    added = hunk.added_lines()
+    return bool(added) and all(is_trivial_line(line.text, prefixes, imports_checked) for line in added)
+
+
+def run_detectors(
+    hunks: Iterable[Hunk],
+    root: Optional[Union[str, Path]] = None,
+    detectors: Optional[list[Detector]] = None,
+) -> DetectionResult:
+    """
+    Run the fast local detectors over the added lines of a diff.
+
+    Args:
+        hunks: Hunks in diff order (see utils.diff_parser)
+        root: Checkout of the PR head; enables whole-file and requirements checks
+        detectors: Detectors to run, defaults to DETECTORS
+
+    Returns:
+        DetectionResult with the smells found and the hunks that still need the LLM
+    """
+    root = Path(root).resolve() if root is not None else None
+    detectors = detectors or DETECTORS
+    hunks = list(hunks)
+    files: dict[int, FileChanges] = {}
+    for hunk in hunks:
+        key = id(hunk.file)
+        if key not in files:
+            files[key] = FileChanges(hunk.file, root=root)
+        files[key].hunks.append(hunk)
+
+    # Import lines are only accounted for where the unused-import check can see the whole file
+    imports_checked = {
+        key: detect_unused_imports in detectors and can_check_imports(changes)
+        for key, changes in files.items()
+    }
+    covered, remaining = [], []
+    for hunk in hunks:
+        key = id(hunk.file)
+        is_done = is_covered(hunk, comment_prefixes(hunk.file.path), imports_checked[key])
+        (covered if is_done else remaining).append(hunk)
+
+    smells = [
+        smell
+        for changes in files.values()
+        for detector in detectors
+        for smell in detector(changes)
+    ]
+    return DetectionResult(smells, covered, remaining)
@@ -0,0 +1,274 @@
+"""
+Avaliação da LLM e do SonarQube contra o ground truth dos PRs.
+
+Carrega todos os datasets em arrays NumPy de acertos (PR, tipo de smell,
+detector), calcula precisão, recall e F1 por tipo e no total com intervalos de
+confiança por bootstrap e regenera o analysis.csv.
+
+Uso:
+    python evaluate_results.py [diretorio_ou_store] [--analysis analysis.csv]
+                               [--metricas avaliacao.csv] [--bootstrap N]
+"""
+import argparse
+import csv
+import json
+import sys
+import warnings
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+from utils.dataset_store import DatasetStore, is_store
+from utils.matching import normalize_smell_type, rule_category, smell_category
+
+DETECTORES = ("llm", "sonarqube")
+
+# Reamostragens calculadas por produto de matrizes, limitando a memória dos pesos
+AMOSTRAS_POR_BLOCO = 200
+
+# Nomes usados no analysis.csv para os tipos de smell do estudo
+NOMES_TIPOS = {
+    "LONG_PARAMETER_LIST": "Long parameter list",
+    "DUPLICATE_CODE": "Código duplicado",
+    "GOD_METHOD": "God Method",
+    "COMPLEXITY": "Complexidade Ciclomática",
+    "FEATURE_ENVY": "Feature Envy",
+}
+
+COLUNAS_ANALYSIS = [
+    "smell_principal", "llm_detectou", "sonarqube_detectou",
+    "smells_adicionais_llm", "smells_adicionais_sonarqube",
+]
+
+
+def tipo_llm(smell: dict) -> str:
+    """Tipo de um smell da LLM: a categoria comum às duas ferramentas, ou o próprio tipo."""
+    smell_type = smell.get("smell_type", "")
+    return smell_category(smell_type) or normalize_smell_type(smell_type)
+
+
+def tipo_sonarqube(issue: dict) -> str:
+    rule = issue.get("rule", "")
+    # Regras sem categoria ficam com um tipo próprio, que nunca é ground truth
+    return rule_category(rule) or f"SONAR:{rule}"
+
+
+def tipo_ground_truth(label: str) -> str:
+    return smell_category(label) or normalize_smell_type(label)
+
+
+def pr_order(path: Path) -> tuple:
+    number = path.stem[len("pr_"):]
+    return (0, int(number), "") if number.isdigit() else (1, 0, number)
+
+
+def iter_datasets(caminho: str) -> Iterator[dict]:
+    """Datasets de um diretório de pr_*.json ou de um DatasetStore, em ordem de PR."""
+    if is_store(caminho):
+        yield from sorted(DatasetStore(caminho).scan(), key=lambda data: data.get("pr_number", 0))
+        return
+    for path in sorted(Path(caminho).glob("pr_*.json"), key=pr_order):
+        yield json.loads(path.read_text())
+
+
+@dataclass
+class Evaluation:
+    """
+    Acertos de cada detector por PR e tipo de smell.
+
+    `hits[p, t, d]` indica que o detector d apontou algum smell do tipo t no
+    PR p e `truth[p, t]` que o tipo t é ground truth do PR p. `counts[p, t, d]`
+    guarda quantos achados o detector reportou daquele tipo.
+    """
+    prs: list
+    tipos: list[str]
+    truth: np.ndarray
+    hits: np.ndarray
+    counts: np.ndarray
+    labels: list[list[str]]
+
+    @cached_property
+    def outcomes(self) -> np.ndarray:
+        """TP, FP e FN de cada PR, com shape (3, P, T, D)."""
+        truth = self.truth[:, :, None]
+        return np.stack([self.hits & truth, self.hits & ~truth, ~self.hits & truth]).astype(np.int64)
+
+    @cached_property
+    def _outcomes_matrix(self) -> np.ndarray:
+        # (P, 3 * T * D) em float64, para que os produtos usem BLAS; as contagens continuam exatas
+        _, p, t, d = self.outcomes.shape
+        return self.outcomes.transpose(1, 0, 2, 3).reshape(p, 3 * t * d).astype(np.float64)
+
+    def confusion(self, weights: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        TP, FP e FN por tipo e detector, com shape (..., T, D).
+
+        Com `weights` de shape (B, P), cada linha é uma reamostragem dos PRs
+        (quantas vezes cada PR aparece) e o resultado ganha uma dimensão B.
+        """
+        if weights is None:
+            tp, fp, fn = self.outcomes.sum(axis=1)
+            return tp, fp, fn
+        _, _, t, d = self.outcomes.shape
+        totals = (weights.astype(np.float64) @ self._outcomes_matrix).reshape(-1, 3, t, d)
+        return totals[:, 0], totals[:, 1], totals[:, 2]
+
+
+def load_evaluation(caminho: str) -> Evaluation:
+    """Monta os arrays a partir dos PRs com ground truth; os demais são ignorados."""
+    prs, labels, hit_types, count_rows = [], [], [], []
+    for data in iter_datasets(caminho):
+        ground_truth = data.get("ground_truth_smells") or []
+        if not ground_truth:
+            continue
+        por_detector = [
+            [tipo_llm(smell) for smell in data.get("llm_smells", [])],
+            [tipo_sonarqube(issue) for issue in data.get("sonar_issues", [])],
+        ]
+        prs.append(data.get("pr_number"))
+        labels.append(ground_truth)
+        hit_types.append([tipo_ground_truth(label) for label in ground_truth])
+        count_rows.append(por_detector)
+
+    tipos = sorted({t for row in hit_types for t in row}
+                   | {t for row in count_rows for detector in row for t in detector})
+    index = {tipo: i for i, tipo in enumerate(tipos)}
+
+    truth = np.zeros((len(prs), len(tipos)), dtype=bool)
+    counts = np.zeros((len(prs), len(tipos), len(DETECTORES)), dtype=np.int64)
+    for p, (verdadeiros, por_detector) in enumerate(zip(hit_types, count_rows)):
+        truth[p, [index[t] for t in verdadeiros]] = True
+        for d, achados in enumerate(por_detector):
+            np.add.at(counts[p, :, d], [index[t] for t in achados], 1)
+
+    return Evaluation(prs, tipos, truth, counts > 0, counts, labels)
+
+
+def scores(tp: np.ndarray, fp: np.ndarray, fn: np.ndarray) -> dict[str, np.ndarray]:
+    """Precisão, recall e F1 elemento a elemento (NaN onde não há denominador)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        precision = tp / (tp + fp)
+        recall = tp / (tp + fn)
+        f1 = 2 * tp / (2 * tp + fp + fn)
+    return {"precisao": precision, "recall": recall, "f1": f1}
+
+
+def bootstrap(
+    evaluation: Evaluation, amostras: int, seed: int = 0, bloco: int = AMOSTRAS_POR_BLOCO
+) -> dict[str, np.ndarray]:
+    """
+    Métricas de `amostras` reamostragens dos PRs com reposição.
+
+    Cada reamostragem vira um vetor de pesos por PR, então um bloco inteiro de
+    reamostragens é calculado com um único produto de matrizes. Devolve arrays
+    de shape (B, T + 1, D): a última posição em T é o total (micro) de todos
+    os tipos.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(evaluation.prs)
+    parts = []
+    for start in range(0, amostras, bloco):
+        size = min(bloco, amostras - start)
+        draws = rng.integers(0, n, size=(size, n))
+        weights = np.zeros((size, n), dtype=np.int64)
+        np.add.at(weights, (np.arange(size)[:, None], draws), 1)
+        parts.append(evaluation.confusion(weights))
+
+    tp, fp, fn = (np.concatenate(matrices) for matrices in zip(*parts))
+    tp, fp, fn = (np.concatenate([m, m.sum(axis=1, keepdims=True)], axis=1) for m in (tp, fp, fn))
+    return scores(tp, fp, fn)
+
+
+def metric_rows(evaluation: Evaluation, amostras: int, confianca: float = 0.95) -> list[dict]:
+    tp, fp, fn = evaluation.confusion()
+    tp, fp, fn = (np.concatenate([m, m.sum(axis=0, keepdims=True)]) for m in (tp, fp, fn))
+    pontos = scores(tp, fp, fn)
+    intervalos = {}
+    if amostras:
+        alpha = (1 - confianca) / 2
+        with warnings.catch_warnings():
+            # Tipos sem nenhum acerto possível dão NaN em todas as reamostragens
+            warnings.simplefilter("ignore", RuntimeWarning)
+            for nome, valores in bootstrap(evaluation, amostras).items():
+                intervalos[nome] = np.nanquantile(valores, [alpha, 1 - alpha], axis=0)
+
+    rows = []
+    for t, tipo in enumerate([*evaluation.tipos, "TOTAL"]):
+        for d, detector in enumerate(DETECTORES):
+            row = {
+                "tipo": NOMES_TIPOS.get(tipo, tipo), "detector": detector,
+                "tp": int(tp[t, d]), "fp": int(fp[t, d]), "fn": int(fn[t, d]),
+            }
+            for nome, valores in pontos.items():
+                row[nome] = round(float(valores[t, d]), 4)
+                if nome in intervalos:
+                    low, high = intervalos[nome][:, t, d]
+                    row[f"{nome}_ic_inf"] = round(float(low), 4)
+                    row[f"{nome}_ic_sup"] = round(float(high), 4)
+            rows.append(row)
+    return rows
+
+
+def analysis_rows(evaluation: Evaluation) -> list[dict]:
+    """Uma linha por (PR, smell principal), no formato do analysis.csv."""
+    index = {tipo: i for i, tipo in enumerate(evaluation.tipos)}
+    totais = evaluation.counts.sum(axis=1)
+    # Achados fora de todos os tipos ground truth do PR
+    adicionais = totais - (evaluation.counts * evaluation.truth[:, :, None]).sum(axis=1)
+    rows = []
+    for p, labels in enumerate(evaluation.labels):
+        for label in labels:
+            t = index[tipo_ground_truth(label)]
+            rows.append({
+                "smell_principal": NOMES_TIPOS.get(evaluation.tipos[t], label),
+                "llm_detectou": int(evaluation.hits[p, t, 0]),
+                "sonarqube_detectou": int(evaluation.hits[p, t, 1]),
+                "smells_adicionais_llm": int(adicionais[p, 0]),
+                "smells_adicionais_sonarqube": int(adicionais[p, 1]),
+            })
+    return rows
+
+
+def write_csv(path: str, rows: list[dict], fieldnames: list[str]) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Avalia LLM e SonarQube contra o ground truth")
+    parser.add_argument("caminho", nargs="?", default="dataset",
+                        help="Diretório com pr_*.json ou um DatasetStore")
+    parser.add_argument("--analysis", default="analysis.csv", help="Onde regenerar o analysis.csv")
+    parser.add_argument("--metricas", default="avaliacao.csv",
+                        help="CSV com precisão, recall e F1 por tipo e detector")
+    parser.add_argument("--bootstrap", type=int, default=1000,
+                        help="Reamostragens para os intervalos de confiança (0 desativa)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    evaluation = load_evaluation(args.caminho)
+    if not evaluation.prs:
+        sys.exit(f"❌ Nenhum PR com ground truth em {args.caminho}")
+
+    write_csv(args.analysis, analysis_rows(evaluation), COLUNAS_ANALYSIS)
+    metricas = metric_rows(evaluation, args.bootstrap)
+    write_csv(args.metricas, metricas, list(metricas[0]))
+
+    print(f"✓ {len(evaluation.prs)} PR(s) com ground truth, {len(evaluation.tipos)} tipo(s) de smell")
+    print(f"✓ analysis.csv regenerado em {args.analysis}")
+    print(f"✓ Métricas em {args.metricas}")
+    for row in metricas:
+        if row["tipo"] == "TOTAL":
+            print(f"  {row['detector']:<10} precisão {row['precisao']:.3f}  recall {row['recall']:.3f}"
+                  f"  F1 {row['f1']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,36 +3,67 @@ Script to generate both PR comment and structured smells JSON.
 This script is called by the GitHub Actions workflow.
 """
 import json
-import sys
 from pathlib import Path
 
-from utils import read_diff
-from llm import generate_response
+from utils import parse_args, read_diff
+from llm.pipeline import review_diff_file
+from llm.cache import get_cache
+from llm.resilience import get_serving_log
+from llm.streaming import ReviewFileSink, stream_response
+from llm.tracing import start_trace
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python generate_review.py <diff_file>", file=sys.stderr)
-        sys.exit(1)
-    
-    diff_file = sys.argv[1]
-    diff_content = read_diff(diff_file)
+    args = parse_args()
+    trace = start_trace(
+        diff_file=str(args.diff_file),
+        options={key: value for key, value in vars(args).items() if key not in ("diff_file", "trace_file")},
+    )
     
     # Generate structured response with code smells
-    response = generate_response(diff_content)
-    
-    # Save PR comment to review.md (for GitHub comment)
-    Path("review.md").write_text(response.pr_comment)
+    with trace.stage("review"):
+        if args.stream:
+            # Findings land in llm_smells.jsonl and review.md while the model is still writing
+            sink = ReviewFileSink("llm_smells.jsonl", "review.md")
+            try:
+                with trace.stage("read_diff"):
+                    diff_content = read_diff(args.diff_file)
+                response = stream_response(
+                    diff_content, sink.on_smell, sink.on_comment, on_restart=sink.reset
+                )
+            finally:
+                sink.close()
+        else:
+            response = review_diff_file(
+                args.diff_file, workers=args.workers, pack=args.pack,
+                prefilter=args.prefilter, repo_root=args.repo_root, state_file=args.state_file,
+            )
     
-    # Save structured smells to JSON (for dataset)
-    smells_data = [smell.model_dump() for smell in response.smells]
-    Path("llm_smells.json").write_text(
-        json.dumps(smells_data, indent=2)
-    )
+    with trace.stage("write_outputs"):
+        # Save PR comment to review.md (for GitHub comment)
+        Path("review.md").write_text(response.pr_comment)
+        
+        # Save structured smells to JSON (for dataset)
+        smells_data = [smell.model_dump() for smell in response.smells]
+        Path("llm_smells.json").write_text(
+            json.dumps(smells_data, indent=2)
+        )
     
     print(f"✓ Generated review with {len(response.smells)} code smell(s)")
     print(f"✓ Saved PR comment to review.md")
     print(f"✓ Saved structured smells to llm_smells.json")
+    
+    cache = get_cache()
+    if cache:
+        stats = cache.summary()
+        print(f"✓ Review cache: {stats['hits']} hit(s), {stats['misses']} miss(es)"
+              + (f", {stats['write_errors']} failed write(s)" if stats["write_errors"] else ""))
+    print(f"✓ {get_serving_log()}")
+    
+    summary = trace.write(args.trace_file, smells=len(response.smells), served=get_serving_log().summary()["paths"])
+    cost = "unknown" if summary["cost_usd"] is None else f"${summary['cost_usd']:.4f}"
+    print(f"✓ Saved trace to {args.trace_file}: {summary['wall_seconds']:.2f}s, "
+          f"{summary['prompt_tokens']}+{summary['completion_tokens']} token(s), cost {cost}")
 
 
 if __name__ == "__main__":
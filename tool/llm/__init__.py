@@ -1,4 +1,5 @@
 from .main import generate_response
 from .models import CodeReviewResponse, CodeSmell
+from .parallel import generate_parallel_response
 
-__all__ = ['generate_response', 'CodeReviewResponse', 'CodeSmell']
+__all__ = ['generate_response', 'generate_parallel_response', 'CodeReviewResponse', 'CodeSmell']
@@ -0,0 +1,300 @@
+import hashlib
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional
+
+from pydantic import BaseModel
+
+from .config import get_api_key, get_backend_settings, get_request_timeout
+from .models import CodeReviewResponse, CodeSmell, MultiPRReviewResponse, PRCodeSmell, PRComment
+from .packing import split_pr_batch
+from .tokens import estimate_tokens
+
+
+@dataclass
+class Completion:
+    """A validated review plus the metadata of the request that produced it."""
+    response: CodeReviewResponse | MultiPRReviewResponse
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class ReviewBackend(ABC):
+    """Something that turns chat messages into a CodeReviewResponse."""
+
+    name = "backend"
+
+    @abstractmethod
+    def complete(
+        self, messages: list[dict], model: str, schema: type[BaseModel] = CodeReviewResponse
+    ) -> Completion:
+        """Answer with an instance of `schema`, CodeReviewResponse unless a multi-PR request."""
+        ...
+
+    def stream(self, messages: list[dict], model: str, on_delta: Callable[[str], None]) -> Completion:
+        """
+        Like complete, but passes the raw JSON output to `on_delta` as it arrives.
+
+        Backends without streaming support deliver the whole output in one delta.
+        """
+        completion = self.complete(messages, model)
+        on_delta(completion.response.model_dump_json())
+        return completion
+
+
+class OpenAIBackend(ReviewBackend):
+    """OpenAI Structured Outputs; honours OPENAI_BASE_URL, e.g. to target the stub server."""
+
+    name = "openai"
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None):
+        self.base_url = base_url
+        self.api_key = api_key
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        # openai is slow to import, so the client is only built on first use
+        with self._lock:
+            if self._client is None:
+                from openai import OpenAI
+
+                # Retries are handled by call_with_retries so they also go through the rate limiter
+                # The client timeout matches the deadline so abandoned hedged requests end too
+                self._client = OpenAI(
+                    api_key=self.api_key or get_api_key(),
+                    base_url=self.base_url,
+                    max_retries=0,
+                    timeout=get_request_timeout(),
+                )
+            return self._client
+
+    def complete(
+        self, messages: list[dict], model: str, schema: type[BaseModel] = CodeReviewResponse
+    ) -> Completion:
+        completion = self.client.beta.chat.completions.parse(
+            model=model,
+            messages=messages,
+            response_format=schema,
+        )
+        return self._to_completion(completion, model)
+
+    def stream(self, messages: list[dict], model: str, on_delta: Callable[[str], None]) -> Completion:
+        with self.client.beta.chat.completions.stream(
+            model=model,
+            messages=messages,
+            response_format=CodeReviewResponse,
+            stream_options={"include_usage": True},
+        ) as stream:
+            for event in stream:
+                if event.type == "content.delta":
+                    on_delta(event.delta)
+            completion = stream.get_final_completion()
+        return self._to_completion(completion, model)
+
+    @staticmethod
+    def _to_completion(completion, model: str) -> Completion:
+        usage = completion.usage
+        return Completion(
+            response=completion.choices[0].message.parsed,
+            model=completion.model or model,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+        )
+
+
+class StubBackendError(Exception):
+    """Injected failure; carries a status code so retry logic treats it like an API error."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"stub backend injected HTTP {status_code}")
+        self.status_code = status_code
+
+
+FILE_RE = re.compile(r"^\+\+\+ (?:b/)?(.+)$")
+HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+TODO_RE = re.compile(r"#\s*(TODO|FIXME|HACK)\b", re.IGNORECASE)
+
+
+def stub_review(diff_content: str) -> CodeReviewResponse:
+    """
+    Deterministic, schema-valid review of a diff without any model.
+
+    Reports TODO/FIXME/HACK comments on added lines and one STUB_SMELL per hunk.
+    """
+    smells = []
+    path = "unknown"
+    lineno = 0
+    for line in diff_content.splitlines():
+        if line.startswith("+++ "):
+            if match := FILE_RE.match(line):
+                path = match.group(1)
+            continue
+        hunk = HUNK_RE.match(line)
+        if hunk:
+            lineno = int(hunk.group(1))
+            smells.append(CodeSmell(
+                file=path, line=lineno, smell_type="STUB_SMELL",
+                message="Placeholder finding reported by the stub backend", severity="INFO",
+            ))
+            continue
+        if line.startswith("+"):
+            if TODO_RE.search(line):
+                smells.append(CodeSmell(
+                    file=path, line=lineno, smell_type="TODO_COMMENT",
+                    message="Incomplete work left in a TODO comment", severity="MINOR",
+                ))
+            lineno += 1
+        elif line.startswith(" "):
+            lineno += 1
+
+    by_type = Counter(smell.smell_type for smell in smells)
+    summary = ", ".join(f"{count} {smell_type}" for smell_type, count in sorted(by_type.items()))
+    return CodeReviewResponse(
+        smells=smells,
+        pr_comment=f"## Stub Review\n\nFound {len(smells)} finding(s){': ' + summary if summary else ''}.",
+    )
+
+
+def stub_multi_review(content: str) -> MultiPRReviewResponse:
+    """stub_review of every PR of a multi-PR request (see llm.packing.format_pr_batch)."""
+    smells = []
+    comments = []
+    for pr_id, diff in split_pr_batch(content):
+        review = stub_review(diff)
+        smells.extend(PRCodeSmell(pr_id=pr_id, **smell.model_dump()) for smell in review.smells)
+        comments.append(PRComment(pr_id=pr_id, pr_comment=review.pr_comment))
+    return MultiPRReviewResponse(smells=smells, comments=comments)
+
+
+class StubBackend(ReviewBackend):
+    """
+    Offline stand-in for the LLM with configurable latency and error injection.
+
+    A share `slow_rate` of requests takes `slow_latency` instead, to model the
+    occasional multi-minute call. Latency jitter, slow requests and injected
+    errors come from a RNG seeded with the request
+    content and how often that content was seen, so a run is reproducible no
+    matter how worker threads interleave.
+    """
+
+    name = "stub"
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        seed: int = 0,
+        ttft_share: float = 0.1,
+        delta_size: int = 16,
+        slow_rate: float = 0.0,
+        slow_latency: float = 0.0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.seed = seed
+        self.ttft_share = ttft_share
+        self.delta_size = delta_size
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.calls = 0
+        self._seen: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _rng(self, content: str) -> random.Random:
+        digest = hashlib.sha256(content.encode()).hexdigest()
+        with self._lock:
+            self.calls += 1
+            attempt = self._seen[digest]
+            self._seen[digest] += 1
+        return random.Random(f"{self.seed}:{digest}:{attempt}")
+
+    def _delay(self, rng: random.Random) -> float:
+        delay = self.latency + (rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if self.slow_rate and rng.random() < self.slow_rate:
+            delay = self.slow_latency
+        return max(delay, 0.0)
+
+    def complete(
+        self, messages: list[dict], model: str, schema: type[BaseModel] = CodeReviewResponse
+    ) -> Completion:
+        content = messages[-1]["content"]
+        rng = self._rng(content)
+
+        delay = self._delay(rng)
+        if delay > 0:
+            time.sleep(delay)
+        if rng.random() < self.error_rate:
+            raise StubBackendError(self.error_status)
+
+        return self._completion(messages, model, schema)
+
+    def stream(self, messages: list[dict], model: str, on_delta: Callable[[str], None]) -> Completion:
+        """
+        Emit the stub review in small deltas.
+
+        The first delta arrives after `ttft_share` of the latency and the rest
+        of the latency is spread evenly over the remaining deltas.
+        """
+        rng = self._rng(messages[-1]["content"])
+        delay = self._delay(rng)
+        first = delay * self.ttft_share
+        if rng.random() < self.error_rate:
+            time.sleep(first)
+            raise StubBackendError(self.error_status)
+
+        completion = self._completion(messages, model)
+        output = completion.response.model_dump_json()
+        deltas = [output[i:i + self.delta_size] for i in range(0, len(output), self.delta_size)]
+        step = (delay - first) / max(len(deltas) - 1, 1)
+        for index, delta in enumerate(deltas):
+            time.sleep(first if index == 0 else step)
+            on_delta(delta)
+        return completion
+
+    def _completion(
+        self, messages: list[dict], model: str, schema: type[BaseModel] = CodeReviewResponse
+    ) -> Completion:
+        content = messages[-1]["content"]
+        response = stub_multi_review(content) if schema is MultiPRReviewResponse else stub_review(content)
+        return Completion(
+            response=response,
+            model=model,
+            prompt_tokens=sum(estimate_tokens(m["content"], model) for m in messages),
+            completion_tokens=estimate_tokens(response.model_dump_json(), model),
+        )
+
+
+_backend: Optional[ReviewBackend] = None
+
+
+def configure_backend(backend: Optional[ReviewBackend]) -> None:
+    """Use `backend` for every review in this process; None restores the configured one."""
+    global _backend
+    _backend = backend
+
+
+@lru_cache(maxsize=None)
+def _default_backend() -> ReviewBackend:
+    name, options = get_backend_settings()
+    if name == "stub":
+        return StubBackend(**options)
+    if name == "openai":
+        return OpenAIBackend()
+    raise ValueError(f"Unknown REVIEW_BACKEND {name!r} (expected 'openai' or 'stub')")
+
+
+def get_backend() -> ReviewBackend:
+    return _backend or _default_backend()
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from .config import SYSTEM_PROMPT, get_cache_settings
+from .models import CodeReviewResponse
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+    write_errors: int = 0
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache of validated review responses.
+
+    Entries are JSON files named after a SHA-256 of everything that determines
+    the answer: the diff, the backend and model, the system prompt and the
+    response schema. Writes go to a temporary file that is atomically renamed
+    into place, so concurrent CI jobs sharing the directory never see partial
+    entries. Reads refresh the entry's mtime and eviction removes the least
+    recently used entries once the directory grows beyond `max_bytes`.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._schema = json.dumps(CodeReviewResponse.model_json_schema(), sort_keys=True)
+
+    def key_for(self, diff_content: str, model: str, backend: str = "openai") -> str:
+        digest = hashlib.sha256()
+        for part in (backend, model, SYSTEM_PROMPT, self._schema, diff_content):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _count(self, field: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self.stats, field, getattr(self.stats, field) + amount)
+
+    def get(self, key: str) -> Optional[CodeReviewResponse]:
+        path = self._path(key)
+        try:
+            response = CodeReviewResponse.model_validate_json(path.read_text())
+        except (OSError, ValueError):
+            # Missing, evicted by another job, or unreadable: treat as a miss
+            self._count("misses")
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count("hits")
+        return response
+
+    def put(self, key: str, response: CodeReviewResponse) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(response.model_dump_json())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self._count("writes")
+        self.evict()
+
+    def record_write_error(self, error: OSError) -> None:
+        """Count a failed put; the review itself is still returned."""
+        self._count("write_errors")
+        print(f"Review cache write failed, continuing without it: {error}", file=sys.stderr)
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for path in self.directory.glob("*.json"):
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                self._count("evictions")
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def summary(self) -> dict:
+        lookups = self.stats.hits + self.stats.misses
+        return {
+            **asdict(self.stats),
+            "hit_rate": self.stats.hits / lookups if lookups else 0.0,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache, or None when caching is disabled."""
+    settings = get_cache_settings()
+    if settings is None:
+        return None
+    directory, max_bytes = settings
+    return ResponseCache(directory, max_bytes)
@@ -1,14 +1,13 @@
 import os
-import dotenv
+from functools import lru_cache
 
-dotenv.load_dotenv()
-
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY is not set")
-
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_CACHE_DIR = ".review_cache"
+DEFAULT_CACHE_MAX_MB = 256
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_REQUEST_TIMEOUT = 180.0
+DEFAULT_BREAKER_FAILURES = 3
+DEFAULT_BREAKER_COOLDOWN = 60.0
 
 SYSTEM_PROMPT = """You are an expert code smell detector for Pull Request reviews.
 
@@ -41,3 +40,116 @@ Also provide a general PR comment in Markdown format that will be posted as a co
 - Be professional and helpful
 
 Be thorough but fair - only report genuine issues that impact code quality."""
+
+USER_PROMPT = "Please analyze the following code diff and identify any code smells:\n\n"
+
+# Appended to SYSTEM_PROMPT when several small PRs are reviewed in one request
+MULTI_PR_PROMPT = """
+
+This request contains several independent Pull Requests. Each one starts with a line of the form `=== PR <id> ===` followed by its diff. Review every PR on its own, as if it were the only one:
+- Set `pr_id` on every code smell to the id of the PR whose diff contains it
+- Write exactly one comment per PR in `comments`, with its `pr_id`
+- Never mix findings or feedback of different PRs"""
+
+MULTI_PR_USER_PROMPT = "Please analyze the following Pull Requests and identify any code smells in each of them:\n\n"
+
+
+@lru_cache(maxsize=None)
+def load_env() -> None:
+    """Load the .env file once, on first use rather than at import time."""
+    import dotenv
+
+    dotenv.load_dotenv()
+
+
+def get_api_key() -> str:
+    load_env()
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY is not set")
+    return api_key
+
+
+def get_model() -> str:
+    load_env()
+    return os.getenv("OPENAI_MODEL", DEFAULT_MODEL)
+
+
+def get_max_retries() -> int:
+    load_env()
+    return int(os.getenv("REVIEW_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+
+
+def get_request_timeout() -> float | None:
+    """Deadline in seconds for one model request (REVIEW_TIMEOUT, 0 disables)."""
+    load_env()
+    timeout = float(os.getenv("REVIEW_TIMEOUT", DEFAULT_REQUEST_TIMEOUT))
+    return timeout if timeout > 0 else None
+
+
+def get_hedge_after() -> float | str | None:
+    """
+    When to fire a duplicate request (REVIEW_HEDGE_AFTER).
+
+    A number of seconds, "p95" to use the observed p95 latency of the model,
+    or None (unset or 0) to disable hedging.
+    """
+    load_env()
+    value = os.getenv("REVIEW_HEDGE_AFTER", "").strip().lower()
+    if not value or value == "0":
+        return None
+    if value == "p95":
+        return value
+    return float(value)
+
+
+def get_fallback_models() -> list[str]:
+    """Models to try, in order, when the primary one fails (REVIEW_FALLBACK_MODELS)."""
+    load_env()
+    primary = get_model()
+    models = [m.strip() for m in os.getenv("REVIEW_FALLBACK_MODELS", "").split(",")]
+    return [m for m in dict.fromkeys(models) if m and m != primary]
+
+
+def get_breaker_settings() -> tuple[int, float]:
+    """Return (consecutive failures that open a model's circuit, cooldown in seconds)."""
+    load_env()
+    failures = int(os.getenv("REVIEW_BREAKER_FAILURES", DEFAULT_BREAKER_FAILURES))
+    cooldown = float(os.getenv("REVIEW_BREAKER_COOLDOWN", DEFAULT_BREAKER_COOLDOWN))
+    return failures, cooldown
+
+
+def get_backend_settings() -> tuple[str, dict]:
+    """Return the REVIEW_BACKEND name and, for the stub, its latency/error options."""
+    load_env()
+    name = os.getenv("REVIEW_BACKEND", "openai").lower()
+    options = {}
+    if name == "stub":
+        options = {
+            "latency": float(os.getenv("REVIEW_STUB_LATENCY", "0")),
+            "jitter": float(os.getenv("REVIEW_STUB_JITTER", "0")),
+            "error_rate": float(os.getenv("REVIEW_STUB_ERROR_RATE", "0")),
+            "seed": int(os.getenv("REVIEW_STUB_SEED", "0")),
+            "slow_rate": float(os.getenv("REVIEW_STUB_SLOW_RATE", "0")),
+            "slow_latency": float(os.getenv("REVIEW_STUB_SLOW_LATENCY", "0")),
+        }
+    return name, options
+
+
+def get_cache_settings() -> tuple[str, int] | None:
+    """Return (directory, max_bytes) for the response cache, or None when disabled."""
+    load_env()
+    if os.getenv("REVIEW_CACHE", "1").lower() in ("0", "false", "no"):
+        return None
+    directory = os.getenv("REVIEW_CACHE_DIR", DEFAULT_CACHE_DIR)
+    max_mb = int(os.getenv("REVIEW_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB))
+    return directory, max_mb * 1024 * 1024
+
+
+def __getattr__(name: str):
+    # Keep `from .config import OPENAI_MODEL` working without eager loading
+    if name == "OPENAI_API_KEY":
+        return get_api_key()
+    if name == "OPENAI_MODEL":
+        return get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from utils.diff_parser import Hunk
+
+from .backends import get_backend
+from .config import SYSTEM_PROMPT, get_model
+from .models import CodeReviewResponse, CodeSmell
+
+# Version 2 keys hunks by fingerprint and occurrence instead of fingerprint alone
+STATE_VERSION = 2
+
+
+def hunk_fingerprint(hunk: Hunk) -> str:
+    """
+    Content hash of a hunk that ignores where the hunk sits in the file.
+
+    Line numbers and the @@ section text are left out, so a hunk that only
+    moved because code above it changed keeps its fingerprint.
+    """
+    digest = hashlib.sha256(hunk.path.encode())
+    for line in hunk.lines:
+        digest.update(b"\n")
+        digest.update(line.kind.encode())
+        digest.update(line.text.encode())
+    return digest.hexdigest()
+
+
+def hunk_keys(hunks: list[Hunk]) -> list[str]:
+    """
+    State keys of the hunks: the fingerprint plus its occurrence in the diff.
+
+    Identical hunks (the same change twice in a file) get keys of their own,
+    so each keeps its own smells instead of both reusing the merged set.
+    """
+    seen: Counter = Counter()
+    keys = []
+    for hunk in hunks:
+        fingerprint = hunk_fingerprint(hunk)
+        keys.append(f"{fingerprint}:{seen[fingerprint]}")
+        seen[fingerprint] += 1
+    return keys
+
+
+@dataclass
+class ReuseReport:
+    total_hunks: int
+    reused_hunks: int
+    reused_smells: int
+
+    @property
+    def reused_share(self) -> float:
+        return self.reused_hunks / self.total_hunks if self.total_hunks else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"Incremental review: reused {self.reused_hunks}/{self.total_hunks} hunk(s) "
+            f"({self.reused_share:.0%}), carried over {self.reused_smells} smell(s)"
+        )
+
+
+class ReviewState:
+    """
+    Per-hunk review results persisted between runs on the same PR.
+
+    Smells are stored relative to the start of their hunk so they can be
+    shifted onto the hunk's new position in later diffs. Smells on files
+    without a reviewed hunk are kept per file, with their absolute line. The
+    state is tied to the backend, model and system prompt; changing any of
+    them starts from scratch.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.signature = hashlib.sha256(
+            f"{get_backend().name}\0{get_model()}\0{SYSTEM_PROMPT}".encode()
+        ).hexdigest()
+        self.hunks: dict[str, list[dict]] = {}
+        self.files: dict[str, list[dict]] = {}
+        self.pr_comment: Optional[str] = None
+
+    def load(self) -> "ReviewState":
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return self
+        if data.get("version") == STATE_VERSION and data.get("signature") == self.signature:
+            self.hunks = data.get("hunks", {})
+            self.files = data.get("files", {})
+            self.pr_comment = data.get("pr_comment")
+        return self
+
+    def save(self) -> None:
+        payload = json.dumps({
+            "version": STATE_VERSION,
+            "signature": self.signature,
+            "pr_comment": self.pr_comment,
+            "hunks": self.hunks,
+            "files": self.files,
+        })
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".tmp-")
+        with os.fdopen(fd, "w") as f:
+            f.write(payload)
+        os.replace(tmp_path, self.path)
+
+
+def attribute_smells(smells: list[CodeSmell], hunks: list[Hunk]) -> dict[int, list[CodeSmell]]:
+    """
+    Assign each smell to the hunk it was reported on.
+
+    A smell whose line falls outside every hunk of its file goes to the closest
+    hunk of that file; smells on files without hunks are keyed by -1.
+    """
+    assigned: dict[int, list[CodeSmell]] = {}
+    for smell in smells:
+        candidates = [i for i, hunk in enumerate(hunks) if hunk.path == smell.file]
+        index = next((i for i in candidates if hunks[i].contains_new_line(smell.line)), None)
+        if index is None and candidates:
+            index = min(candidates, key=lambda i: abs(hunks[i].header.new_start - smell.line))
+        assigned.setdefault(-1 if index is None else index, []).append(smell)
+    return assigned
+
+
+def review_incrementally(
+    hunks: list[Hunk],
+    state_file: Union[str, Path],
+    review_fn: Callable[[list[Hunk]], CodeReviewResponse],
+) -> tuple[CodeReviewResponse, ReuseReport]:
+    """
+    Review only the hunks that are new or changed since the previous run.
+
+    Args:
+        hunks: All hunks of the current diff
+        state_file: JSON file holding the results of the previous run
+        review_fn: Reviews a list of hunks (see llm.pipeline.review_hunks)
+
+    Returns:
+        The review for the whole diff and how much of it was reused
+    """
+    state = ReviewState(state_file).load()
+    keys = hunk_keys(hunks)
+
+    reused: list[CodeSmell] = []
+    changed: list[int] = []
+    next_hunks: dict[str, list[dict]] = {}
+    for index, (hunk, key) in enumerate(zip(hunks, keys)):
+        stored = state.hunks.get(key)
+        if stored is None:
+            changed.append(index)
+            continue
+        next_hunks[key] = stored
+        for entry in stored:
+            smell = dict(entry)
+            smell["line"] = hunk.header.new_start + smell.pop("offset")
+            reused.append(CodeSmell(file=hunk.path, **smell))
+
+    # File-level smells are superseded once a hunk of their file is reviewed again
+    changed_paths = {hunks[index].path for index in changed}
+    next_files = {path: stored for path, stored in state.files.items() if path not in changed_paths}
+    carried = [CodeSmell(file=path, **entry) for path, stored in next_files.items() for entry in stored]
+    reused.extend(carried)
+
+    report = ReuseReport(len(hunks), len(hunks) - len(changed), len(reused))
+    print(report, file=sys.stderr)
+
+    if not changed and state.pr_comment is not None:
+        response = CodeReviewResponse(smells=reused, pr_comment=state.pr_comment)
+    else:
+        changed_hunks = [hunks[i] for i in changed]
+        fresh = review_fn(changed_hunks) if changed_hunks else CodeReviewResponse(smells=[], pr_comment="")
+        fresh_files: dict[str, list[dict]] = {}
+        for local_index, smells in attribute_smells(fresh.smells, changed_hunks).items():
+            if local_index < 0:
+                for smell in smells:
+                    fresh_files.setdefault(smell.file, []).append(smell.model_dump(exclude={"file"}))
+                continue
+            hunk = changed_hunks[local_index]
+            next_hunks.setdefault(keys[changed[local_index]], []).extend(
+                {**smell.model_dump(exclude={"file", "line"}), "offset": smell.line - hunk.header.new_start}
+                for smell in smells
+            )
+        for index in changed:
+            # Clean hunks are remembered too, so they are not re-sent next time
+            next_hunks.setdefault(keys[index], [])
+        if fresh_files:
+            # A new review of a file replaces its earlier file-level findings
+            superseded = {id(smell) for smell in carried if smell.file in fresh_files}
+            reused = [smell for smell in reused if id(smell) not in superseded]
+            next_files.update(fresh_files)
+
+        pr_comment = fresh.pr_comment
+        if reused:
+            pr_comment += (
+                f"\n\n_{report.reused_hunks} unchanged hunk(s) were not re-reviewed; "
+                f"{len(reused)} earlier finding(s) on them are still included._"
+            )
+        response = CodeReviewResponse(smells=fresh.smells + reused, pr_comment=pr_comment)
+
+    state.hunks = next_hunks
+    state.files = next_files
+    state.pr_comment = response.pr_comment
+    state.save()
+    return response, report
@@ -1,14 +1,23 @@
-from openai import OpenAI
-
-from .config import OPENAI_API_KEY, OPENAI_MODEL, SYSTEM_PROMPT
+from .backends import get_backend
+from .cache import get_cache
+from .config import SYSTEM_PROMPT, USER_PROMPT, get_model
 from .models import CodeReviewResponse
-
-client = OpenAI(api_key=OPENAI_API_KEY)
+from .ratelimit import get_rate_limiter
+from .resilience import ServedBy, get_serving_log, serve
+from .tokens import estimate_tokens
+from .tracing import get_trace
 
 
 def generate_response(diff_content: str) -> CodeReviewResponse:
     """
-    Generate a structured code review response using OpenAI's Structured Outputs.
+    Generate a structured code review response with the configured backend
+    (OpenAI Structured Outputs by default, see llm.backends).
+
+    Responses are served from the on-disk cache when the same diff was already
+    reviewed with the same model, prompt and schema. Rate limited (429) and
+    server (5xx) errors are retried with exponential backoff. Requests are
+    bounded by REVIEW_TIMEOUT, optionally hedged and fall back to
+    REVIEW_FALLBACK_MODELS (see llm.resilience).
     
     Args:
         diff_content: The git diff content to analyze
@@ -16,17 +25,40 @@ def generate_response(diff_content: str) -> CodeReviewResponse:
     Returns:
         CodeReviewResponse with detected code smells and PR comment
     """
-    completion = client.beta.chat.completions.parse(
-        model=OPENAI_MODEL,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {
-                "role": "user", 
-                "content": f"Please analyze the following code diff and identify any code smells:\n\n{diff_content}"
-            },
-        ],
-        response_format=CodeReviewResponse,
-    )
-    
-    return completion.choices[0].message.parsed
+    model = get_model()
+    backend = get_backend()
+    cache = get_cache()
+    trace = get_trace()
+    if cache:
+        with trace.stage("cache_lookup"):
+            cached = cache.get(cache.key_for(diff_content, model, backend.name))
+        if cached is not None:
+            trace.count("cache_hits")
+            get_serving_log().record(ServedBy(model=model, path="cache", latency=0.0))
+            return cached
+        trace.count("cache_misses")
+
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"{USER_PROMPT}{diff_content}"},
+    ]
+
+    def request(request_model: str):
+        limiter = get_rate_limiter()
+        if limiter:
+            limiter.acquire(estimate_tokens(SYSTEM_PROMPT + messages[1]["content"], request_model))
+        return backend.complete(messages, request_model)
 
+    with trace.stage("llm_request"):
+        completion, served_model = serve(request)
+    trace.add_completion(completion)
+    response = completion.response
+    if cache and response is not None:
+        # A fallback answer is cached under its own model, so the primary is asked again next time
+        with trace.stage("cache_write"):
+            try:
+                cache.put(cache.key_for(diff_content, served_model, backend.name), response)
+            except OSError as e:
+                # Disk full or read-only cache: never throw away an answer that was paid for
+                cache.record_write_error(e)
+    return response
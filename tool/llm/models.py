@@ -14,3 +14,20 @@ class CodeReviewResponse(BaseModel):
     """Complete code review response with detected smells and general feedback."""
     smells: list[CodeSmell] = Field(description="List of all code smells detected in the PR")
     pr_comment: str = Field(description="General Markdown-formatted comment to be posted on the PR, summarizing the review")
+
+
+class PRCodeSmell(CodeSmell):
+    """A code smell in a request that reviews several PRs at once."""
+    pr_id: str = Field(description="Id of the PR the smell belongs to, as given in its '=== PR <id> ===' header")
+
+
+class PRComment(BaseModel):
+    """General feedback for one PR of a multi-PR request."""
+    pr_id: str = Field(description="Id of the PR, as given in its '=== PR <id> ===' header")
+    pr_comment: str = Field(description="General Markdown-formatted comment to be posted on this PR, summarizing its review")
+
+
+class MultiPRReviewResponse(BaseModel):
+    """Review of several independent PRs: CodeReviewResponse with a PR id per smell and a comment per PR."""
+    smells: list[PRCodeSmell] = Field(description="List of all code smells detected in any of the PRs")
+    comments: list[PRComment] = Field(description="Exactly one comment for every PR in the request")
@@ -0,0 +1,179 @@
+import sys
+
+from pydantic import ValidationError
+
+from utils.diff_parser import FileHeader, parse_lines
+
+from .backends import get_backend
+from .cache import get_cache
+from .config import MULTI_PR_PROMPT, MULTI_PR_USER_PROMPT, SYSTEM_PROMPT, USER_PROMPT, get_model
+from .main import generate_response
+from .models import CodeReviewResponse, CodeSmell, MultiPRReviewResponse
+from .packing import format_pr_batch
+from .ratelimit import get_rate_limiter
+from .resilience import ServedBy, get_serving_log, serve
+from .tokens import estimate_tokens, get_budget
+from .tracing import get_trace
+
+# Raised by the OpenAI client for truncated or filtered answers; openai is imported lazily
+INVALID_OUTPUT_ERRORS = ("LengthFinishReasonError", "ContentFilterFinishReasonError")
+
+
+class PRBatchError(ValueError):
+    """A multi-PR answer that cannot be split back into per-PR reviews."""
+
+
+def is_invalid_output(exc: BaseException) -> bool:
+    """True when the model answered but its output does not fit the multi-PR schema."""
+    return isinstance(exc, (PRBatchError, ValidationError)) or type(exc).__name__ in INVALID_OUTPUT_ERRORS
+
+
+def multi_pr_input_tokens(model: str) -> int:
+    """Tokens left for diff content in a multi-PR request, see llm.tokens.get_budget."""
+    extra_prompt = (
+        estimate_tokens(MULTI_PR_PROMPT, model)
+        + estimate_tokens(MULTI_PR_USER_PROMPT, model)
+        - estimate_tokens(USER_PROMPT, model)
+    )
+    return get_budget(model).input_tokens - extra_prompt
+
+
+def diff_paths(diff_content: str) -> set[str]:
+    """Old and new paths of every file in a diff."""
+    paths = set()
+    for record in parse_lines(diff_content.splitlines()):
+        if isinstance(record, FileHeader):
+            paths.update(path for path in (record.old_path, record.new_path) if path)
+    return paths
+
+
+def split_response(
+    response: MultiPRReviewResponse, diffs: list[tuple[str, str]]
+) -> dict[str, CodeReviewResponse]:
+    """
+    Per-PR reviews of a multi-PR answer.
+
+    The answer is only accepted if every PR of the request has exactly one
+    comment and every smell names a PR of the request and a file of that PR's
+    diff, so findings are never attributed to the wrong PR.
+
+    Args:
+        response: Parsed answer to a multi-PR request
+        diffs: (PR id, diff) pairs the request was built from
+
+    Returns:
+        CodeReviewResponse by PR id
+
+    Raises:
+        PRBatchError: The answer failed validation
+    """
+    if response is None:
+        raise PRBatchError("the model returned no parsed answer")
+    paths = {pr_id: diff_paths(diff) for pr_id, diff in diffs}
+
+    comments: dict[str, str] = {}
+    for comment in response.comments:
+        if comment.pr_id not in paths:
+            raise PRBatchError(f"comment for unknown PR {comment.pr_id!r}")
+        if comment.pr_id in comments:
+            raise PRBatchError(f"more than one comment for PR {comment.pr_id!r}")
+        comments[comment.pr_id] = comment.pr_comment
+    missing = [pr_id for pr_id, _ in diffs if pr_id not in comments]
+    if missing:
+        raise PRBatchError(f"no comment for PR(s) {', '.join(map(repr, missing))}")
+
+    smells: dict[str, list[CodeSmell]] = {pr_id: [] for pr_id in paths}
+    for smell in response.smells:
+        if smell.pr_id not in paths:
+            raise PRBatchError(f"smell for unknown PR {smell.pr_id!r}")
+        if smell.file not in paths[smell.pr_id]:
+            raise PRBatchError(f"smell in {smell.file} is not part of the diff of PR {smell.pr_id!r}")
+        smells[smell.pr_id].append(CodeSmell(**smell.model_dump(exclude={"pr_id"})))
+
+    return {
+        pr_id: CodeReviewResponse(smells=smells[pr_id], pr_comment=comments[pr_id])
+        for pr_id, _ in diffs
+    }
+
+
+def review_pr_batch(
+    diffs: list[tuple[str, str]]
+) -> tuple[dict[str, CodeReviewResponse], dict[str, str]]:
+    """
+    Review several small, independent PRs with a single request.
+
+    The diffs are sent one after the other under `=== PR <id> ===` headers with
+    MULTI_PR_PROMPT, so the system prompt is paid once per batch instead of
+    once per PR, and the MultiPRReviewResponse is split back into one review
+    per PR. Cached single-PR reviews are reused and their PRs left out of the
+    request. If the answer fails validation (see split_response), every PR of
+    the batch is reviewed again with its own request through generate_response.
+
+    Args:
+        diffs: (PR id, diff) pairs; ids must not contain line breaks
+
+    Returns:
+        CodeReviewResponse by PR id, in the order of `diffs`, and how each PR
+        was served: "batch" (the multi-PR request), "cache", "single" (the
+        only PR left to review) or "fallback" (re-reviewed after the multi-PR
+        answer was rejected)
+    """
+    if len(diffs) == 1:
+        pr_id, diff = diffs[0]
+        return {pr_id: generate_response(diff)}, {pr_id: "single"}
+
+    model = get_model()
+    backend = get_backend()
+    cache = get_cache()
+    trace = get_trace()
+    reviews: dict[str, CodeReviewResponse] = {}
+    served: dict[str, str] = {}
+    if cache:
+        # Only lookups: answers to the multi-PR prompt are not stored under single-PR keys
+        for pr_id, diff in diffs:
+            with trace.stage("cache_lookup"):
+                cached = cache.get(cache.key_for(diff, model, backend.name))
+            if cached is not None:
+                trace.count("cache_hits")
+                get_serving_log().record(ServedBy(model=model, path="cache", latency=0.0))
+                reviews[pr_id] = cached
+                served[pr_id] = "cache"
+            else:
+                trace.count("cache_misses")
+    pending = [(pr_id, diff) for pr_id, diff in diffs if pr_id not in reviews]
+    path = "single"
+
+    if len(pending) > 1:
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT + MULTI_PR_PROMPT},
+            {"role": "user", "content": f"{MULTI_PR_USER_PROMPT}{format_pr_batch(pending)}"},
+        ]
+
+        def request(request_model: str):
+            limiter = get_rate_limiter()
+            if limiter:
+                limiter.acquire(estimate_tokens(messages[0]["content"] + messages[1]["content"], request_model))
+            return backend.complete(messages, request_model, MultiPRReviewResponse)
+
+        trace.count("pr_batches")
+        try:
+            with trace.stage("llm_request"):
+                completion, _ = serve(request)
+            trace.add_completion(completion)
+            reviews.update(split_response(completion.response, pending))
+            served.update((pr_id, "batch") for pr_id, _ in pending)
+            pending = []
+        except Exception as exc:
+            if not is_invalid_output(exc):
+                raise
+            trace.count("pr_batch_fallbacks")
+            print(
+                f"Multi-PR answer for {len(pending)} PR(s) rejected ({exc}); reviewing them one by one",
+                file=sys.stderr,
+            )
+            path = "fallback"
+
+    for pr_id, diff in pending:
+        reviews[pr_id] = generate_response(diff)
+        served[pr_id] = path
+    return {pr_id: reviews[pr_id] for pr_id, _ in diffs}, served
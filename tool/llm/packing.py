@@ -0,0 +1,237 @@
+import fnmatch
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
+from utils.diff_parser import FileHeader, Hunk
+
+from .tokens import TokenBudget, estimate_tokens
+
+# Files that are produced by tools rather than written by hand
+GENERATED_PATTERNS = [
+    "*.lock",
+    "*-lock.json",
+    "*.lock.json",
+    "*.min.js",
+    "*.min.css",
+    "*.map",
+    "*_pb2.py",
+    "*.pb.go",
+    "*.snap",
+    "vendor/*",
+    "*/vendor/*",
+    "node_modules/*",
+    "dist/*",
+    "build/*",
+]
+GENERATED_MARKERS = ("@generated", "DO NOT EDIT", "Code generated by")
+
+# Delimiter in front of each diff of a multi-PR request (see MULTI_PR_PROMPT)
+PR_HEADER = "=== PR {pr_id} ==="
+PR_HEADER_RE = re.compile(r"^=== PR (.+) ===$", re.MULTILINE)
+
+
+@dataclass
+class FileGroup:
+    """The hunks of one file and their estimated size."""
+    header: FileHeader
+    hunks: list[Hunk] = field(default_factory=list)
+    hunk_tokens: list[int] = field(default_factory=list)
+    header_tokens: int = 0
+
+    @property
+    def path(self) -> str:
+        return self.header.path
+
+    @property
+    def tokens(self) -> int:
+        return self.header_tokens + sum(self.hunk_tokens)
+
+    def summary(self) -> str:
+        added = sum(len(hunk.added_lines()) for hunk in self.hunks)
+        removed = sum(1 for hunk in self.hunks for line in hunk.lines if line.kind == "-")
+        return f"{self.path}: {len(self.hunks)} hunk(s), +{added}/-{removed} lines"
+
+
+@dataclass
+class Pack:
+    """One request worth of diff content."""
+    groups: list[FileGroup] = field(default_factory=list)
+    tokens: int = 0
+
+    def text(self) -> str:
+        parts = []
+        for group in self.groups:
+            parts.extend(group.header.header_lines)
+            parts.extend(hunk.text(with_file_header=False) for hunk in group.hunks)
+        return "".join(parts)
+
+
+@dataclass
+class SkippedFile:
+    summary: str
+    reason: str
+    tokens: int
+
+
+@dataclass
+class PackPlan:
+    packs: list[Pack]
+    skipped: list[SkippedFile]
+    budget: TokenBudget
+
+    def report(self) -> str:
+        lines = [
+            f"{len(self.packs)} request(s), input budget {self.budget.input_tokens} tokens"
+            f" (+{self.budget.prompt_tokens} prompt, {self.budget.output_tokens} reserved for output)"
+        ]
+        for index, pack in enumerate(self.packs, 1):
+            lines.append(
+                f"  request {index}: ~{pack.tokens + self.budget.prompt_tokens} tokens,"
+                f" {len(pack.groups)} file part(s)"
+            )
+        for skipped in self.skipped:
+            lines.append(f"  skipped {skipped.summary} (~{skipped.tokens} tokens, {skipped.reason})")
+        return "\n".join(lines)
+
+
+def is_generated(group: FileGroup) -> bool:
+    path = group.path
+    if any(fnmatch.fnmatch(path, pattern) for pattern in GENERATED_PATTERNS):
+        return True
+    for hunk in group.hunks[:1]:
+        for line in hunk.added_lines()[:5]:
+            if any(marker in line.text for marker in GENERATED_MARKERS):
+                return True
+    return False
+
+
+def group_by_file(hunks: Iterable[Hunk], model: Optional[str] = None) -> list[FileGroup]:
+    groups: list[FileGroup] = []
+    for hunk in hunks:
+        if not groups or groups[-1].header is not hunk.file:
+            header_text = "".join(hunk.file.header_lines)
+            groups.append(FileGroup(hunk.file, header_tokens=estimate_tokens(header_text, model)))
+        groups[-1].hunks.append(hunk)
+        groups[-1].hunk_tokens.append(estimate_tokens(hunk.text(with_file_header=False), model))
+    return groups
+
+
+def split_group(group: FileGroup, limit: int) -> list[FileGroup]:
+    """Split a file into runs of consecutive hunks that each fit in `limit` tokens."""
+    parts = [FileGroup(group.header, header_tokens=group.header_tokens)]
+    for hunk, tokens in zip(group.hunks, group.hunk_tokens):
+        if parts[-1].hunks and parts[-1].tokens + tokens > limit:
+            parts.append(FileGroup(group.header, header_tokens=group.header_tokens))
+        parts[-1].hunks.append(hunk)
+        parts[-1].hunk_tokens.append(tokens)
+    return parts
+
+
+def pack_hunks(
+    hunks: Iterable[Hunk],
+    budget: TokenBudget,
+    model: Optional[str] = None,
+) -> PackPlan:
+    """
+    Pack diff hunks into as few requests as possible under the token budget.
+
+    Hunks of the same file stay in the same request unless the file alone does
+    not fit, in which case it is split at hunk boundaries. Generated files and
+    hunks that cannot fit in any request are skipped and only summarized.
+    Requests are filled first-fit by decreasing size.
+
+    Args:
+        hunks: Hunks in diff order (see utils.diff_parser)
+        budget: Token limits of the target model
+        model: Model name used for token estimation
+
+    Returns:
+        PackPlan with the packed requests and the skipped files
+    """
+    limit = budget.input_tokens
+    if limit <= 0:
+        raise ValueError(f"Token budget leaves no room for diff content: {budget}")
+
+    parts: list[FileGroup] = []
+    skipped: list[SkippedFile] = []
+    for group in group_by_file(hunks, model):
+        if is_generated(group):
+            skipped.append(SkippedFile(group.summary(), "generated file", group.tokens))
+            continue
+
+        fitting = FileGroup(group.header, header_tokens=group.header_tokens)
+        for hunk, tokens in zip(group.hunks, group.hunk_tokens):
+            if group.header_tokens + tokens > limit:
+                oversized = FileGroup(group.header, [hunk], [tokens], group.header_tokens)
+                skipped.append(SkippedFile(oversized.summary(), "hunk too large", oversized.tokens))
+            else:
+                fitting.hunks.append(hunk)
+                fitting.hunk_tokens.append(tokens)
+        if fitting.hunks:
+            parts.extend(split_group(fitting, limit))
+
+    packs: list[Pack] = []
+    for part in sorted(parts, key=lambda p: p.tokens, reverse=True):
+        target = next((pack for pack in packs if pack.tokens + part.tokens <= limit), None)
+        if target is None:
+            target = Pack()
+            packs.append(target)
+        target.groups.append(part)
+        target.tokens += part.tokens
+
+    # Keep files in diff order inside each request
+    order = {id(part): index for index, part in enumerate(parts)}
+    for pack in packs:
+        pack.groups.sort(key=lambda part: order[id(part)])
+
+    return PackPlan(packs, skipped, budget)
+
+
+def format_pr_batch(diffs: Iterable[tuple[str, str]]) -> str:
+    """Join (PR id, diff) pairs into one request body, each diff under its PR_HEADER."""
+    return "".join(f"{PR_HEADER.format(pr_id=pr_id)}\n{diff.rstrip()}\n\n" for pr_id, diff in diffs)
+
+
+def split_pr_batch(content: str) -> list[tuple[str, str]]:
+    """Inverse of format_pr_batch; text before the first header is ignored."""
+    parts = PR_HEADER_RE.split(content)
+    return [(pr_id, diff.strip("\n") + "\n") for pr_id, diff in zip(parts[1::2], parts[2::2])]
+
+
+def iter_pr_batches(
+    sizes: Iterable[tuple[str, int]],
+    limit: int,
+    max_prs: int,
+    max_pr_tokens: int,
+) -> Iterator[list[str]]:
+    """
+    Group small PRs into multi-PR requests, in input order.
+
+    PRs of up to `max_pr_tokens` are collected into batches of at most
+    `max_prs` PRs and `limit` tokens of diff content; a batch is yielded as soon
+    as the next PR would not fit. Larger PRs are yielded on their own, so a
+    batch of one means the PR is reviewed with a regular request.
+
+    Args:
+        sizes: (PR id, estimated diff tokens) pairs
+        limit: Tokens available for diff content in one request
+        max_prs: Most PRs packed into one request
+        max_pr_tokens: Largest diff that is still packed with others
+
+    Yields:
+        Lists of PR ids
+    """
+    batch: list[str] = []
+    total = 0
+    for pr_id, tokens in sizes:
+        if tokens > min(max_pr_tokens, limit):
+            yield [pr_id]
+            continue
+        if batch and (len(batch) >= max_prs or total + tokens > limit):
+            yield batch
+            batch, total = [], 0
+        batch.append(pr_id)
+        total += tokens
+    if batch:
+        yield batch
@@ -0,0 +1,150 @@
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Union
+
+from utils import split_diff, split_diff_file
+
+from .main import generate_response
+from .models import CodeReviewResponse, CodeSmell
+
+SEVERITY_ORDER = ["INFO", "MINOR", "MAJOR", "CRITICAL"]
+
+ReviewFn = Callable[[str], CodeReviewResponse]
+
+
+def severity_rank(severity: str) -> int:
+    severity = severity.upper()
+    return SEVERITY_ORDER.index(severity) if severity in SEVERITY_ORDER else 0
+
+
+def dedupe_smells(smells: list[CodeSmell]) -> list[CodeSmell]:
+    """
+    Drop repeated findings for the same file, line and smell type.
+
+    When the same smell is reported more than once the most severe report is kept.
+    """
+    unique: dict[tuple[str, int, str], CodeSmell] = {}
+    for smell in smells:
+        key = (smell.file, smell.line, smell.smell_type.upper())
+        kept = unique.get(key)
+        if kept is None or severity_rank(smell.severity) > severity_rank(kept.severity):
+            unique[key] = smell
+    return sorted(unique.values(), key=lambda s: (s.file, s.line, s.smell_type))
+
+
+def synthesize_pr_comment(smells: list[CodeSmell], chunk_count: int) -> str:
+    """Build a single Markdown PR comment from the merged smells."""
+    if not smells:
+        return (
+            "## Code Review\n\n"
+            f"Reviewed {chunk_count} change(s) and found no code smells. Nice work!"
+        )
+
+    by_severity = Counter(smell.severity.upper() for smell in smells)
+    summary = ", ".join(
+        f"{by_severity[severity]} {severity.lower()}"
+        for severity in reversed(SEVERITY_ORDER)
+        if by_severity[severity]
+    )
+
+    lines = [
+        "## Code Review",
+        "",
+        f"Reviewed {chunk_count} change(s) and found {len(smells)} code smell(s): {summary}.",
+        "",
+        "| Severity | Location | Type | Message |",
+        "| --- | --- | --- | --- |",
+    ]
+    ranked = sorted(smells, key=lambda s: (-severity_rank(s.severity), s.file, s.line))
+    for smell in ranked:
+        message = smell.message.replace("|", "\\|").replace("\n", " ")
+        lines.append(
+            f"| {smell.severity.upper()} | `{smell.file}:{smell.line}` | {smell.smell_type} | {message} |"
+        )
+    return "\n".join(lines)
+
+
+def merge_responses(responses: list[CodeReviewResponse]) -> CodeReviewResponse:
+    """Merge per-chunk reviews into one deduplicated review with a synthesized comment."""
+    smells = dedupe_smells([smell for response in responses for smell in response.smells])
+    return CodeReviewResponse(
+        smells=smells,
+        pr_comment=synthesize_pr_comment(smells, len(responses)),
+    )
+
+
+def review_chunks_in_parallel(
+    chunks: Iterable[str],
+    review_fn: ReviewFn,
+    max_workers: int = 4,
+) -> CodeReviewResponse:
+    """
+    Review diff chunks concurrently with a bounded thread pool and merge the results.
+
+    Chunks are consumed lazily: at most two per worker are submitted at a
+    time, so only the reviews, not the diff text, of a huge diff are kept.
+
+    Args:
+        chunks: Independent diff chunks (see utils.split_diff)
+        review_fn: Function that reviews one chunk, e.g. generate_response
+        max_workers: Maximum number of requests in flight
+
+    Returns:
+        Merged CodeReviewResponse
+    """
+    chunks = iter(chunks)
+    head = list(islice(chunks, 2))
+    if not head:
+        return merge_responses([])
+
+    if len(head) == 1:
+        # Nothing to merge: keep the model's own PR comment
+        return review_fn(head[0])
+
+    max_workers = max(1, max_workers)
+    responses = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Results are collected in chunk order, so the merged review does not depend on timing
+        pending = deque()
+        for chunk in chain(head, chunks):
+            pending.append(executor.submit(review_fn, chunk))
+            if len(pending) >= 2 * max_workers:
+                responses.append(pending.popleft().result())
+        responses.extend(future.result() for future in pending)
+
+    return merge_responses(responses)
+
+
+def generate_parallel_response(
+    diff_content: str,
+    max_workers: int = 4,
+    per_hunk: bool = True,
+    review_fn: Optional[ReviewFn] = None,
+) -> CodeReviewResponse:
+    """
+    Split a diff into per-hunk (or per-file) chunks and review them concurrently.
+
+    Args:
+        diff_content: The git diff content to analyze
+        max_workers: Maximum number of requests in flight
+        per_hunk: Split per hunk; otherwise per file
+        review_fn: Chunk reviewer, defaults to generate_response
+
+    Returns:
+        CodeReviewResponse with the merged smells and a synthesized PR comment
+    """
+    chunks = split_diff(diff_content, per_hunk)
+    return review_chunks_in_parallel(chunks, review_fn or generate_response, max_workers)
+
+
+def generate_parallel_response_from_file(
+    diff_file: Union[str, Path],
+    max_workers: int = 4,
+    per_hunk: bool = True,
+    review_fn: Optional[ReviewFn] = None,
+) -> CodeReviewResponse:
+    """Like generate_parallel_response, but streams the chunks from a diff file."""
+    chunks = split_diff_file(diff_file, per_hunk)
+    return review_chunks_in_parallel(chunks, review_fn or generate_response, max_workers)
@@ -0,0 +1,122 @@
+import sys
+from pathlib import Path
+from typing import Optional, Union
+
+from detectors import run_detectors
+from utils import iter_hunks, read_diff
+from utils.diff_parser import Hunk
+from utils.split_diff import iter_chunks
+
+from .config import get_model
+from .incremental import review_incrementally
+from .main import generate_response
+from .models import CodeReviewResponse, CodeSmell
+from .packing import PackPlan, pack_hunks
+from .parallel import dedupe_smells, review_chunks_in_parallel, synthesize_pr_comment
+from .tokens import get_budget
+from .tracing import get_trace
+
+
+def plan_requests(hunks: list[Hunk]) -> PackPlan:
+    """Pack hunks into requests that fit the configured model."""
+    model = get_model()
+    with get_trace().stage("pack"):
+        return pack_hunks(hunks, get_budget(model), model)
+
+
+def add_skipped_section(response: CodeReviewResponse, plan: PackPlan) -> CodeReviewResponse:
+    if not plan.skipped:
+        return response
+    lines = ["", "", "<details><summary>Files not reviewed</summary>", ""]
+    lines += [f"- {skipped.summary} ({skipped.reason})" for skipped in plan.skipped]
+    lines.append("</details>")
+    return response.model_copy(update={"pr_comment": response.pr_comment + "\n".join(lines)})
+
+
+def add_local_smells(response: CodeReviewResponse, smells: list[CodeSmell]) -> CodeReviewResponse:
+    """Merge pre-filter findings into an LLM review and mention them in the comment."""
+    if not smells:
+        return response
+    lines = ["", "", f"<details><summary>{len(smells)} finding(s) from static checks</summary>", ""]
+    lines += [f"- `{s.file}:{s.line}` {s.smell_type}: {s.message}" for s in smells]
+    lines.append("</details>")
+    return CodeReviewResponse(
+        smells=dedupe_smells(response.smells + smells),
+        pr_comment=response.pr_comment + "\n".join(lines),
+    )
+
+
+def review_hunks(hunks: list[Hunk], workers: int = 1, pack: bool = False) -> CodeReviewResponse:
+    """Send hunks to the LLM as one request, one request per hunk, or packed requests."""
+    if pack:
+        plan = plan_requests(hunks)
+        print(plan.report(), file=sys.stderr)
+        response = review_chunks_in_parallel(
+            [p.text() for p in plan.packs], generate_response, workers
+        )
+        return add_skipped_section(response, plan)
+
+    if workers > 1:
+        return review_chunks_in_parallel(iter_chunks(hunks), generate_response, workers)
+
+    return generate_response("".join(iter_chunks(hunks, per_hunk=False)))
+
+
+def review_diff_file(
+    diff_file: Union[str, Path],
+    workers: int = 1,
+    pack: bool = False,
+    prefilter: bool = False,
+    repo_root: Optional[Union[str, Path]] = None,
+    state_file: Optional[Union[str, Path]] = None,
+) -> CodeReviewResponse:
+    """
+    Review a diff file with the requested strategy.
+
+    Args:
+        diff_file: Path to the unified diff
+        workers: Requests in flight; above 1 the diff is reviewed hunk by hunk
+        pack: Group hunks into the fewest requests that fit the token budget
+        prefilter: Run the local detectors first and only send the hunks they
+            do not fully cover to the LLM
+        repo_root: Checkout of the PR head, used by the local detectors
+        state_file: Per-hunk results of earlier runs on the same PR; only new
+            or changed hunks are sent to the LLM and the file is updated
+
+    Returns:
+        CodeReviewResponse for the whole diff
+    """
+    trace = get_trace()
+    if not (pack or workers > 1 or prefilter or state_file):
+        with trace.stage("read_diff"):
+            diff_content = read_diff(diff_file)
+        return generate_response(diff_content)
+
+    with trace.stage("read_diff"):
+        hunks = list(iter_hunks(diff_file))
+    local_smells: list[CodeSmell] = []
+    if prefilter:
+        with trace.stage("detectors"):
+            detected = run_detectors(hunks, repo_root)
+        print(
+            f"Static checks: {len(detected.smells)} smell(s), "
+            f"{len(detected.covered)}/{len(hunks)} hunk(s) need no LLM review",
+            file=sys.stderr,
+        )
+        if not detected.remaining:
+            smells = dedupe_smells(detected.smells)
+            return CodeReviewResponse(
+                smells=smells,
+                pr_comment=synthesize_pr_comment(smells, len(hunks)),
+            )
+        local_smells = detected.smells
+        hunks = detected.remaining
+
+    if state_file:
+        response, _ = review_incrementally(
+            hunks, state_file, lambda changed: review_hunks(changed, workers, pack)
+        )
+    else:
+        response = review_hunks(hunks, workers, pack)
+
+    return add_local_smells(response, local_smells)
@@ -0,0 +1,62 @@
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate` units per second."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self._available = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1) -> None:
+        """Block until `amount` units are available and take them."""
+        # Requests bigger than the bucket would wait forever; let them drain it instead
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._available >= amount:
+                    self._available -= amount
+                    return
+                wait = (amount - self._available) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """Client-side requests-per-minute and tokens-per-minute limits."""
+
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60) if tokens_per_minute else None
+
+    def acquire(self, tokens: int = 0) -> None:
+        if self.requests:
+            self.requests.acquire(1)
+        if self.tokens and tokens:
+            self.tokens.acquire(tokens)
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def configure_rate_limits(requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None) -> None:
+    """Limit every LLM request made by this process; pass nothing to disable."""
+    global _limiter
+    if requests_per_minute or tokens_per_minute:
+        _limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    else:
+        _limiter = None
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    return _limiter
@@ -0,0 +1,316 @@
+import queue
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Callable, Optional, TypeVar
+
+from .backends import Completion
+from .config import (
+    get_breaker_settings,
+    get_fallback_models,
+    get_hedge_after,
+    get_max_retries,
+    get_model,
+    get_request_timeout,
+)
+from .retry import call_with_retries, is_retryable
+from .tracing import get_trace
+
+T = TypeVar("T")
+
+# Observed latencies needed before "p95" hedging kicks in
+MIN_HEDGE_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+
+class DeadlineExceeded(Exception):
+    """
+    No answer within the request deadline.
+
+    Deliberately not a TimeoutError: a model that hangs is not retried but
+    handed over to the next fallback model.
+    """
+
+
+class CircuitOpenError(Exception):
+    """Every configured model is currently failing fast."""
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LatencyTracker:
+    """Sliding window of successful request latencies per model."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, model: str, q: float, min_samples: int = MIN_HEDGE_SAMPLES) -> Optional[float]:
+        with self._lock:
+            samples = list(self._samples.get(model, ()))
+        if len(samples) < min_samples:
+            return None
+        return percentile(samples, q)
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a model after `failures` consecutive failed reviews.
+
+    After `cooldown` seconds a single trial request is let through; its outcome
+    closes the circuit again or restarts the cooldown.
+    """
+
+    def __init__(self, failures: int, cooldown: float):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self._trial else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self._trial or self.consecutive_failures >= self.failures:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+    def release_trial(self) -> None:
+        """End a trial that says nothing about the model, so the next request may try again."""
+        with self._lock:
+            self._trial = False
+
+
+@dataclass
+class ServedBy:
+    """How one review was answered: from the cache, the primary model or a fallback."""
+    model: str
+    path: str
+    latency: float
+    retries: int = 0
+
+
+class ServingLog:
+    """Process-wide record of serving paths, to compare tail latency before and after."""
+
+    def __init__(self):
+        self.records: list[ServedBy] = []
+        self._lock = threading.Lock()
+
+    def record(self, served: ServedBy) -> None:
+        with self._lock:
+            self.records.append(served)
+
+    def summary(self) -> dict:
+        with self._lock:
+            records = list(self.records)
+        latencies = [r.latency for r in records if r.path != "cache"]
+        summary = {
+            "reviews": len(records),
+            "paths": dict(Counter(r.path for r in records)),
+            "models": dict(Counter(r.model for r in records)),
+            "retries": sum(r.retries for r in records),
+        }
+        if latencies:
+            summary.update({
+                f"p{int(q * 100)}": percentile(latencies, q) for q in (0.5, 0.95, 0.99)
+            })
+        return summary
+
+    def __str__(self) -> str:
+        summary = self.summary()
+        paths = ", ".join(f"{path} {count}" for path, count in sorted(summary["paths"].items()))
+        text = f"Served {summary['reviews']} request(s): {paths or 'none'}"
+        if "p50" in summary:
+            text += f" (p50 {summary['p50']:.2f}s, p95 {summary['p95']:.2f}s, p99 {summary['p99']:.2f}s)"
+        return text
+
+
+_tracker = LatencyTracker()
+_serving_log = ServingLog()
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_serving_log() -> ServingLog:
+    return _serving_log
+
+
+def get_breaker(model: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if model not in _breakers:
+            _breakers[model] = CircuitBreaker(*get_breaker_settings())
+        return _breakers[model]
+
+
+def hedge_delay(model: str) -> Optional[float]:
+    """Seconds to wait for an answer before sending a duplicate request, or None."""
+    setting = get_hedge_after()
+    if setting == "p95":
+        return _tracker.percentile(model, 0.95)
+    return setting
+
+
+def hedged_call(
+    fn: Callable[[], T],
+    timeout: Optional[float] = None,
+    hedge_after: Optional[float] = None,
+) -> tuple[T, bool]:
+    """
+    Call `fn` with a deadline, sending a duplicate call if the first is slow.
+
+    The calls run on daemon threads; a call that loses the race or misses the
+    deadline is abandoned and its result discarded.
+
+    Args:
+        fn: Zero-argument callable performing one request
+        timeout: Seconds until DeadlineExceeded is raised, None for no deadline
+        hedge_after: Seconds without an answer before the duplicate is sent,
+            None to never hedge
+
+    Returns:
+        The first successful result and whether it came from the duplicate
+    """
+    if timeout is None and hedge_after is None:
+        return fn(), False
+
+    results: queue.Queue = queue.Queue()
+
+    def run(hedge: bool) -> None:
+        try:
+            results.put((hedge, fn(), None))
+        except Exception as exc:
+            results.put((hedge, None, exc))
+
+    start = time.monotonic()
+    threading.Thread(target=run, args=(False,), daemon=True).start()
+    launched = 1
+    failed = 0
+    while True:
+        now = time.monotonic()
+        waits = []
+        if timeout is not None:
+            waits.append(start + timeout - now)
+        if launched == 1 and hedge_after is not None:
+            waits.append(start + hedge_after - now)
+        try:
+            hedge, value, exc = results.get(timeout=max(min(waits), 0) if waits else None)
+        except queue.Empty:
+            if launched == 1 and hedge_after is not None and time.monotonic() - start >= hedge_after:
+                threading.Thread(target=run, args=(True,), daemon=True).start()
+                launched = 2
+                continue
+            raise DeadlineExceeded(f"no response within {timeout:.1f}s")
+
+        if exc is None:
+            return value, hedge
+        failed += 1
+        # Errors are for call_with_retries to handle; only wait if a duplicate is still running
+        if failed == launched:
+            raise exc
+
+
+def is_caller_error(exc: BaseException) -> bool:
+    """Non-retryable 4xx such as a bad request or failed auth: a problem of the call, not the model."""
+    status = getattr(exc, "status_code", None)
+    return status is not None and 400 <= status < 500 and not is_retryable(exc)
+
+
+def serve(request: Callable[[str], Completion]) -> tuple[Completion, str]:
+    """
+    Run one review request with deadlines, hedging, retries and model fallback.
+
+    The configured model is tried first, then REVIEW_FALLBACK_MODELS in order.
+    Each model gets the usual retries, and every attempt is hedged and bounded
+    by REVIEW_TIMEOUT. Models whose circuit breaker is open are skipped;
+    non-retryable 4xx errors do not count against a model's breaker. The
+    path that produced the answer is added to the serving log.
+
+    Args:
+        request: Sends the review request to the given model
+
+    Returns:
+        The completion and the model that produced it
+    """
+    timeout = get_request_timeout()
+    start = time.perf_counter()
+    errors: list[Exception] = []
+    skipped: list[str] = []
+    retries = 0
+
+    def on_retry(*_) -> None:
+        nonlocal retries
+        retries += 1
+        get_trace().count("retries")
+
+    for index, model in enumerate([get_model(), *get_fallback_models()]):
+        breaker = get_breaker(model)
+        if not breaker.allow():
+            skipped.append(model)
+            continue
+
+        # Bound now: an abandoned hedge can finish after the loop moved on to a fallback
+        def timed_request(model: str = model) -> Completion:
+            started = time.perf_counter()
+            completion = request(model)
+            _tracker.record(model, time.perf_counter() - started)
+            return completion
+
+        try:
+            completion, hedged = call_with_retries(
+                lambda: hedged_call(timed_request, timeout, hedge_delay(model)),
+                max_retries=get_max_retries(),
+                on_retry=on_retry,
+            )
+        except Exception as exc:
+            if is_caller_error(exc):
+                breaker.release_trial()
+            else:
+                breaker.record_failure()
+            errors.append(exc)
+            continue
+        breaker.record_success()
+
+        path = "primary" if index == 0 else "fallback"
+        _serving_log.record(ServedBy(
+            model=model,
+            path=f"{path}+hedge" if hedged else path,
+            latency=time.perf_counter() - start,
+            retries=retries,
+        ))
+        return completion, model
+
+    if errors:
+        raise errors[-1]
+    raise CircuitOpenError(f"circuit open for every model: {', '.join(skipped)}")
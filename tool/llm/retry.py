@@ -0,0 +1,66 @@
+import random
+import time
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+RETRYABLE_ERRORS = ("APIConnectionError", "APITimeoutError")
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for rate limiting (429), server errors (5xx) and connection failures."""
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    if type(exc).__name__ in RETRYABLE_ERRORS:
+        return True
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Delay requested by the server through the Retry-After header, if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_retries(
+    fn: Callable[[], T],
+    max_retries: int = 3,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    on_retry: Optional[Callable[[int, BaseException, float], None]] = None,
+) -> T:
+    """
+    Call `fn`, retrying retryable failures with exponential backoff and full jitter.
+
+    Args:
+        fn: Zero-argument callable performing the request
+        max_retries: Retries after the first attempt
+        base_delay: Backoff of the first retry, doubled on every attempt
+        max_delay: Upper bound for a single backoff
+        on_retry: Called with (attempt, exception, delay) before sleeping
+
+    Returns:
+        The result of the first successful call
+    """
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as exc:
+            if attempt >= max_retries or not is_retryable(exc):
+                raise
+            attempt += 1
+            requested = retry_after(exc)
+            if requested is not None:
+                # Capped so a server cannot stall a worker indefinitely
+                delay = min(max_delay, requested)
+            else:
+                delay = random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+            if on_retry:
+                on_retry(attempt, exc, delay)
+            time.sleep(delay)
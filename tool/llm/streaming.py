@@ -0,0 +1,277 @@
+import json
+import threading
+from pathlib import Path
+from typing import Callable, Optional, TextIO, Union
+
+from .backends import Completion, get_backend
+from .cache import get_cache
+from .config import SYSTEM_PROMPT, USER_PROMPT, get_model
+from .models import CodeReviewResponse, CodeSmell
+from .ratelimit import get_rate_limiter
+from .resilience import ServedBy, get_serving_log, serve
+from .tokens import estimate_tokens
+from .tracing import get_trace
+
+ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class StreamingReviewParser:
+    """
+    Incremental parser for the JSON text of a CodeReviewResponse.
+
+    Feed it output deltas as they arrive. Every smell object is passed to
+    `on_smell` as soon as its closing brace is seen, and the text of
+    `pr_comment` is passed to `on_comment` while the string is still being
+    generated, one piece per delta.
+    """
+
+    def __init__(
+        self,
+        on_smell: Callable[[CodeSmell], None],
+        on_comment: Callable[[str], None],
+    ):
+        self.on_smell = on_smell
+        self.on_comment = on_comment
+        self._depth = 0
+        self._in_string = False
+        self._escape = ""
+        self._key: Optional[str] = None
+        self._string_chars: list[str] = []
+        self._string_is_key = False
+        self._expect_key = False
+        self._object_chars: Optional[list[str]] = None
+        self._comment_chars: list[str] = []
+
+    def feed(self, delta: str) -> None:
+        for char in delta:
+            self._consume(char)
+        self._flush_comment()
+
+    def _flush_comment(self) -> None:
+        if self._comment_chars:
+            text = "".join(self._comment_chars)
+            self._comment_chars = []
+            self.on_comment(text)
+
+    def _consume(self, char: str) -> None:
+        if self._object_chars is not None:
+            self._object_chars.append(char)
+
+        if self._in_string:
+            self._consume_string(char)
+            return
+
+        if char == '"':
+            self._in_string = True
+            self._string_chars = []
+            # Keys are the strings that open a member of the top-level object
+            self._string_is_key = self._depth == 1 and self._expect_key
+        elif char == "{":
+            self._depth += 1
+            self._expect_key = self._depth == 1
+            if self._depth == 3 and self._key == "smells":
+                self._object_chars = ["{"]
+        elif char == "}":
+            if self._depth == 3 and self._object_chars is not None:
+                smell = CodeSmell.model_validate_json("".join(self._object_chars))
+                self._object_chars = None
+                self._flush_comment()
+                self.on_smell(smell)
+            self._depth -= 1
+        elif char == "[":
+            self._depth += 1
+        elif char == "]":
+            self._depth -= 1
+        elif char == "," and self._depth == 1:
+            self._expect_key = True
+        elif char == ":" and self._depth == 1:
+            self._expect_key = False
+
+    def _consume_string(self, char: str) -> None:
+        streaming = self._depth == 1 and not self._string_is_key and self._key == "pr_comment"
+
+        if self._escape:
+            self._escape += char
+            decoded = self._decode_escape(self._escape)
+            if decoded is None:
+                return
+            text, leftover = decoded
+            self._escape = ""
+            self._emit(text, streaming)
+            for extra in leftover:
+                self._consume_string(extra)
+            return
+
+        if char == "\\":
+            self._escape = char
+        elif char == '"':
+            self._in_string = False
+            if self._string_is_key:
+                self._key = "".join(self._string_chars)
+        else:
+            self._emit(char, streaming)
+
+    def _decode_escape(self, escape: str) -> Optional[tuple[str, str]]:
+        """Decode a complete escape into (text, leftover), or None while it is partial."""
+        if escape[1] != "u":
+            return ESCAPES.get(escape[1], escape[1]), ""
+        if len(escape) < 6:
+            return None
+        code = int(escape[2:6], 16)
+        if not 0xD800 <= code < 0xDC00:
+            return chr(code), ""
+        # High surrogate: hold it back until the low half has arrived
+        tail = escape[6:]
+        if "\\u".startswith(tail[:2]) and len(tail) < 6:
+            return None
+        if tail[:2] == "\\u":
+            return json.loads(f'"{escape}"'), ""
+        return chr(code), tail
+
+    def _emit(self, text: str, streaming: bool) -> None:
+        if self._string_is_key:
+            self._string_chars.append(text)
+        elif streaming:
+            self._comment_chars.append(text)
+
+
+class ReviewFileSink:
+    """
+    Writes streamed results as they arrive: smells as JSON lines, the comment as Markdown.
+
+    Both files are flushed after every smell and every streamed piece of the
+    comment, so downstream steps can tail them.
+    """
+
+    def __init__(self, smells_path: Union[str, Path], comment_path: Union[str, Path]):
+        self.smells_path = Path(smells_path)
+        self.comment_path = Path(comment_path)
+        self._smells: Optional[TextIO] = None
+        self._comment: Optional[TextIO] = None
+
+    def reset(self) -> None:
+        """(Re)start both files, e.g. when a failed stream is retried."""
+        self.close()
+        self._smells = open(self.smells_path, "w")
+        self._comment = open(self.comment_path, "w")
+
+    def on_smell(self, smell: CodeSmell) -> None:
+        self._smells.write(smell.model_dump_json() + "\n")
+        self._smells.flush()
+
+    def on_comment(self, text: str) -> None:
+        self._comment.write(text)
+        self._comment.flush()
+
+    def close(self) -> None:
+        for f in (self._smells, self._comment):
+            if f is not None:
+                f.close()
+        self._smells = self._comment = None
+
+
+def replay(
+    response: CodeReviewResponse,
+    on_smell: Callable[[CodeSmell], None],
+    on_comment: Callable[[str], None],
+    on_restart: Optional[Callable[[], None]] = None,
+) -> None:
+    """Deliver a complete review through the streaming callbacks."""
+    if on_restart:
+        on_restart()
+    for smell in response.smells:
+        on_smell(smell)
+    on_comment(response.pr_comment)
+
+
+def stream_response(
+    diff_content: str,
+    on_smell: Callable[[CodeSmell], None],
+    on_comment: Callable[[str], None],
+    on_restart: Optional[Callable[[], None]] = None,
+) -> CodeReviewResponse:
+    """
+    Generate a review like generate_response, but deliver it while it is being generated.
+
+    Requests go through llm.resilience.serve like generate_response. Only the
+    latest attempt reaches the callbacks: attempts abandoned by the deadline or
+    overtaken by a hedge, retry or fallback keep running in the background but
+    are muted. If the answer comes from an attempt that was cut off that way,
+    it is replayed in full once it is complete.
+
+    Args:
+        diff_content: The git diff content to analyze
+        on_smell: Called with each CodeSmell as soon as it is complete
+        on_comment: Called with successive pieces of the PR comment
+        on_restart: Called before every attempt so partial output of a failed
+            attempt can be discarded
+
+    Returns:
+        The complete, validated CodeReviewResponse
+    """
+    model = get_model()
+    backend = get_backend()
+    cache = get_cache()
+    trace = get_trace()
+    if cache:
+        with trace.stage("cache_lookup"):
+            cached = cache.get(cache.key_for(diff_content, model, backend.name))
+        if cached is not None:
+            trace.count("cache_hits")
+            get_serving_log().record(ServedBy(model=model, path="cache", latency=0.0))
+            replay(cached, on_smell, on_comment, on_restart)
+            return cached
+        trace.count("cache_misses")
+
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"{USER_PROMPT}{diff_content}"},
+    ]
+    lock = threading.Lock()
+    current: Optional[object] = None
+    delivered: set[int] = set()
+
+    def request(request_model: str) -> Completion:
+        nonlocal current
+        attempt = object()
+        with lock:
+            current = attempt
+            if on_restart:
+                on_restart()
+
+        def forward(callback: Callable) -> Callable:
+            def call(value) -> None:
+                with lock:
+                    if current is attempt:
+                        callback(value)
+            return call
+
+        limiter = get_rate_limiter()
+        if limiter:
+            limiter.acquire(estimate_tokens(SYSTEM_PROMPT + messages[1]["content"], request_model))
+        parser = StreamingReviewParser(forward(on_smell), forward(on_comment))
+        completion = backend.stream(messages, request_model, parser.feed)
+        with lock:
+            if current is attempt:
+                delivered.add(id(completion))
+        return completion
+
+    with trace.stage("llm_request"):
+        try:
+            completion, served_model = serve(request)
+        finally:
+            # Mute attempts that are still running
+            with lock:
+                current = None
+    trace.add_completion(completion)
+    response = completion.response
+    if id(completion) not in delivered:
+        replay(response, on_smell, on_comment, on_restart)
+    if cache and response is not None:
+        # A fallback answer is cached under its own model, so the primary is asked again next time
+        with trace.stage("cache_write"):
+            try:
+                cache.put(cache.key_for(diff_content, served_model, backend.name), response)
+            except OSError as e:
+                cache.record_write_error(e)
+    return response
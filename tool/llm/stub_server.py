@@ -0,0 +1,153 @@
+"""
+Localhost HTTP server that mimics the OpenAI chat completions endpoint.
+
+Point the real client at it to exercise the full network path offline:
+
+    python -m llm.stub_server --port 8089 --latency 0.5 --error-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=stub python generate_review.py diff.patch
+
+Responses are produced by llm.backends.StubBackend, so they are schema-valid
+CodeReviewResponse (or MultiPRReviewResponse) objects with the configured latency
+and injected errors.
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .backends import StubBackend, StubBackendError
+from .models import CodeReviewResponse, MultiPRReviewResponse
+
+# Response models by the name the OpenAI client gives their JSON schema
+SCHEMAS = {schema.__name__: schema for schema in (CodeReviewResponse, MultiPRReviewResponse)}
+
+
+def response_schema(request: dict) -> type:
+    json_schema = (request.get("response_format") or {}).get("json_schema") or {}
+    return SCHEMAS.get(json_schema.get("name"), CodeReviewResponse)
+
+
+def make_handler(backend: StubBackend):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send(404, {"error": {"message": f"Unknown path {self.path}", "type": "not_found"}})
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            model = request.get("model", "stub")
+            if request.get("stream"):
+                self._stream(request.get("messages", []), model)
+                return
+
+            try:
+                completion = backend.complete(request.get("messages", []), model, response_schema(request))
+            except StubBackendError as e:
+                self._send(e.status_code, {"error": {"message": str(e), "type": "server_error"}})
+                return
+
+            self._send(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {
+                        "role": "assistant",
+                        "content": completion.response.model_dump_json(),
+                        "refusal": None,
+                    },
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": completion.prompt_tokens,
+                    "completion_tokens": completion.completion_tokens,
+                    "total_tokens": completion.prompt_tokens + completion.completion_tokens,
+                },
+            })
+
+        def _stream(self, messages: list[dict], model: str) -> None:
+            """Server-sent events in the chat.completion.chunk format."""
+            completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+            created = int(time.time())
+            started = False
+
+            def event(payload: dict) -> None:
+                nonlocal started
+                if not started:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.end_headers()
+                    started = True
+                payload = {"id": completion_id, "object": "chat.completion.chunk",
+                           "created": created, "model": model, **payload}
+                self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+                self.wfile.flush()
+
+            def on_delta(delta: str) -> None:
+                event({"choices": [{"index": 0, "delta": {"role": "assistant", "content": delta},
+                                    "finish_reason": None}]})
+
+            try:
+                completion = backend.stream(messages, model, on_delta)
+            except StubBackendError as e:
+                if not started:
+                    self._send(e.status_code, {"error": {"message": str(e), "type": "server_error"}})
+                return
+
+            event({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            event({"choices": [], "usage": {
+                "prompt_tokens": completion.prompt_tokens,
+                "completion_tokens": completion.completion_tokens,
+                "total_tokens": completion.prompt_tokens + completion.completion_tokens,
+            }})
+            self.wfile.write(b"data: [DONE]\n\n")
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_stub_server(backend: StubBackend, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the server on a background thread; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), make_handler(backend))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve stub OpenAI chat completions on localhost")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests that fail")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected failures")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    backend = StubBackend(args.latency, args.jitter, args.error_rate, args.error_status, args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(backend))
+    print(f"Stub LLM listening on http://{args.host}:{server.server_port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
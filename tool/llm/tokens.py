@@ -0,0 +1,102 @@
+import math
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from .config import SYSTEM_PROMPT, USER_PROMPT, load_env
+
+# Context window and default completion budget per model, in tokens
+MODEL_LIMITS = {
+    "gpt-4o-mini": (128_000, 16_384),
+    "gpt-4o": (128_000, 16_384),
+    "gpt-4.1": (1_047_576, 32_768),
+    "gpt-4.1-mini": (1_047_576, 32_768),
+    "gpt-4.1-nano": (1_047_576, 32_768),
+}
+DEFAULT_LIMITS = (128_000, 16_384)
+
+# List price in USD per million (input, output) tokens, used for cost estimates
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+}
+
+# Rough characters-per-token ratio for code when tiktoken is not installed
+CHARS_PER_TOKEN = 3.5
+
+# Tokens added by the chat format around each message
+MESSAGE_OVERHEAD = 4
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Estimate the number of tokens in `text`.
+
+    Uses tiktoken when it is installed and falls back to a character-based
+    estimate otherwise.
+    """
+    encoding = _encoding(model or "gpt-4o-mini")
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass(frozen=True)
+class TokenBudget:
+    """Per-request token limits for a model."""
+    context_tokens: int
+    output_tokens: int
+    prompt_tokens: int
+
+    @property
+    def input_tokens(self) -> int:
+        """Tokens left for diff content once the prompt and the answer are reserved."""
+        return self.context_tokens - self.output_tokens - self.prompt_tokens
+
+
+def get_budget(model: str) -> TokenBudget:
+    """
+    Token budget for `model`.
+
+    REVIEW_CONTEXT_TOKENS and REVIEW_OUTPUT_TOKENS override the built-in limits,
+    e.g. to keep requests well below the context window for latency.
+    """
+    load_env()
+    context_tokens, output_tokens = MODEL_LIMITS.get(model, DEFAULT_LIMITS)
+    context_tokens = int(os.getenv("REVIEW_CONTEXT_TOKENS", context_tokens))
+    output_tokens = int(os.getenv("REVIEW_OUTPUT_TOKENS", output_tokens))
+    prompt_tokens = (
+        estimate_tokens(SYSTEM_PROMPT, model)
+        + estimate_tokens(USER_PROMPT, model)
+        + 2 * MESSAGE_OVERHEAD
+    )
+    return TokenBudget(context_tokens, output_tokens, prompt_tokens)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """
+    Estimated price in USD of a request, or None for models without a known price.
+
+    Dated snapshots such as gpt-4o-mini-2024-07-18 are priced like their base model.
+    """
+    matches = [name for name in MODEL_PRICES if model == name or model.startswith(f"{name}-")]
+    if not matches:
+        return None
+    input_price, output_price = MODEL_PRICES[max(matches, key=len)]
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
@@ -0,0 +1,119 @@
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from .backends import Completion
+from .tokens import estimate_cost
+
+TRACE_VERSION = 1
+
+
+class Trace:
+    """
+    Timings, token usage and cost of one review run.
+
+    Stages may be entered many times and from several threads (one LLM request
+    per hunk, for example); their count and total duration are accumulated.
+    With concurrent requests the summed duration of a stage can exceed the
+    wall time of the run.
+    """
+
+    def __init__(self, **metadata):
+        self.run_id = uuid.uuid4().hex
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.metadata = metadata
+        self.stages: dict[str, dict] = {}
+        self.counters: Counter = Counter()
+        self.models: Counter = Counter()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd: Optional[float] = 0.0
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stage = self.stages.setdefault(name, {"count": 0, "seconds": 0.0})
+                stage["count"] += 1
+                stage["seconds"] += elapsed
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def add_completion(self, completion: Completion) -> None:
+        """Account the usage reported for one answered request."""
+        cost = estimate_cost(completion.model, completion.prompt_tokens, completion.completion_tokens)
+        with self._lock:
+            self.counters["requests"] += 1
+            self.models[completion.model] += 1
+            self.prompt_tokens += completion.prompt_tokens
+            self.completion_tokens += completion.completion_tokens
+            # One unpriced model makes the total unknown rather than too low
+            if cost is None or self.cost_usd is None:
+                self.cost_usd = None
+            else:
+                self.cost_usd += cost
+
+    def to_dict(self, **extra) -> dict:
+        with self._lock:
+            return {
+                "version": TRACE_VERSION,
+                "run_id": self.run_id,
+                "started_at": self.started_at,
+                **self.metadata,
+                "wall_seconds": round(time.perf_counter() - self._start, 6),
+                "stages": {
+                    name: {"count": stage["count"], "seconds": round(stage["seconds"], 6)}
+                    for name, stage in self.stages.items()
+                },
+                "requests": self.counters["requests"],
+                "retries": self.counters["retries"],
+                "cache_hits": self.counters["cache_hits"],
+                "cache_misses": self.counters["cache_misses"],
+                "pr_batches": self.counters["pr_batches"],
+                "pr_batch_fallbacks": self.counters["pr_batch_fallbacks"],
+                "models": dict(self.models),
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "cost_usd": None if self.cost_usd is None else round(self.cost_usd, 6),
+                **extra,
+            }
+
+    def write(self, path: Union[str, Path], **extra) -> dict:
+        data = self.to_dict(**extra)
+        Path(path).write_text(json.dumps(data, indent=2))
+        return data
+
+
+_trace: Optional[Trace] = None
+_trace_lock = threading.Lock()
+
+
+def start_trace(**metadata) -> Trace:
+    """Begin a new trace for this process; later get_trace() calls return it."""
+    global _trace
+    with _trace_lock:
+        _trace = Trace(**metadata)
+        return _trace
+
+
+def get_trace() -> Trace:
+    """The current trace, started on first use when nobody called start_trace()."""
+    global _trace
+    with _trace_lock:
+        if _trace is None:
+            _trace = Trace()
+        return _trace
@@ -1,13 +1,15 @@
-from utils import parse_args, read_diff
-from llm import generate_response
+from utils import parse_args
+from llm.pipeline import review_diff_file
 
 def main():
     args = parse_args()
     diff_file = args.diff_file
-    diff = read_diff(diff_file)
     
     # Generate structured response with code smells
-    response = generate_response(diff)
+    response = review_diff_file(
+        diff_file, workers=args.workers, pack=args.pack,
+        prefilter=args.prefilter, repo_root=args.repo_root, state_file=args.state_file,
+    )
     
     # Print the PR comment (will be saved to review.md by the workflow)
     print(response.pr_comment)
@@ -0,0 +1,66 @@
+"""
+One-shot migration of dataset/pr_*.json files into a DatasetStore.
+
+After importing, compares the size on disk and the time of a full scan and of
+a single-PR lookup between the JSON files and the store. The original files
+are left untouched.
+
+Usage: python migrate_dataset.py <dataset_dir> <store_dir> [--compress] [--compact]
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+from utils.dataset_store import INDEX_FILE, DatasetStore
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Migrate pr_*.json dataset files into a DatasetStore")
+    parser.add_argument("dataset_dir", help="Directory with pr_*.json files")
+    parser.add_argument("store_dir", help="Store directory, created if needed")
+    parser.add_argument("--compress", action="store_true", help="Gzip every record")
+    parser.add_argument("--compact", action="store_true",
+                        help="Drop records superseded by the migration (e.g. when run twice)")
+    return parser.parse_args()
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    args = parse_args()
+    dataset_dir = Path(args.dataset_dir)
+    store = DatasetStore(args.store_dir, compress=args.compress)
+
+    imported = store.migrate(dataset_dir)
+    if args.compact:
+        store.compact()
+    print(f"✓ Imported {imported} PR(s) into {args.store_dir} ({len(store)} PR(s) in the store)")
+    if not imported:
+        return
+
+    files = list(dataset_dir.glob("pr_*.json"))
+    files_bytes = sum(path.stat().st_size for path in files)
+    store_bytes = sum(path.stat().st_size for path in store.segments())
+    index_bytes = (Path(args.store_dir) / INDEX_FILE).stat().st_size
+
+    files_scan = timed(lambda: [json.loads(path.read_text()) for path in files])
+    store_scan = timed(lambda: list(store.scan()))
+    pr_number = json.loads(files[0].read_text())["pr_number"]
+    files_lookup = timed(lambda: json.loads((dataset_dir / f"pr_{pr_number}.json").read_text()))
+    index_load = timed(lambda: DatasetStore(args.store_dir))
+    store_lookup = timed(lambda: store.get(pr_number))
+
+    print(f"{'':<12}{'size':>14}{'full scan':>12}{'lookup':>12}")
+    print(f"{'pr_*.json':<12}{files_bytes:>12,} B{files_scan:>11.3f}s{files_lookup * 1000:>10.2f}ms")
+    print(f"{'store':<12}{store_bytes:>12,} B{store_scan:>11.3f}s{store_lookup * 1000:>10.2f}ms")
+    print(f"(index {index_bytes:,} B loaded in {index_load * 1000:.2f}ms once per process, "
+          f"{store.garbage_bytes():,} B of superseded records)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.diff_parser import FileHeader, group_hunks, parse_lines  # noqa: E402
+
+PLAIN_DIFF = """\
+--- a/x.py
++++ b/x.py
+@@ -1,2 +1,2 @@
+-a = 1
++a = 2
+ b = 3
+--- a/y.py
++++ b/y.py
+@@ -5,1 +5,2 @@
+ c = 4
++d = 5
+--- /dev/null
++++ b/z.py
+@@ -0,0 +1 @@
++e = 6
+"""
+
+
+def test_plain_unified_diff_with_several_files():
+    records = list(parse_lines(PLAIN_DIFF.splitlines()))
+    headers = [record for record in records if isinstance(record, FileHeader)]
+    assert [(h.old_path, h.new_path) for h in headers] == [("x.py", "x.py"), ("y.py", "y.py"), (None, "z.py")]
+
+    hunks = list(group_hunks(records))
+    assert [hunk.path for hunk in hunks] == ["x.py", "y.py", "z.py"]
+    assert [(line.text, line.new_lineno) for line in hunks[1].added_lines()] == [("d = 5", 6)]
+    assert hunks[2].file.header_lines == ("--- /dev/null\n", "+++ b/z.py\n")
+
+
+def test_removed_line_that_looks_like_a_header_stays_in_the_hunk():
+    diff = "--- a/x.sql\n+++ b/x.sql\n@@ -1,2 +1,1 @@\n--- old comment\n select 1;\n"
+    hunks = list(group_hunks(parse_lines(diff.splitlines())))
+    assert len(hunks) == 1
+    assert [(line.kind, line.text) for line in hunks[0].lines] == [("-", "-- old comment"), (" ", "select 1;")]
@@ -0,0 +1,44 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm.backends import Completion  # noqa: E402
+from llm.models import CodeReviewResponse  # noqa: E402
+from llm.resilience import get_breaker, serve  # noqa: E402
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def test_caller_error_on_a_trial_keeps_the_model_available(monkeypatch):
+    monkeypatch.setenv("OPENAI_MODEL", "trial-primary")
+    monkeypatch.setenv("REVIEW_FALLBACK_MODELS", "trial-fallback")
+    monkeypatch.setenv("REVIEW_BREAKER_FAILURES", "1")
+    monkeypatch.setenv("REVIEW_BREAKER_COOLDOWN", "0.05")
+    monkeypatch.setenv("REVIEW_MAX_RETRIES", "0")
+    monkeypatch.setenv("REVIEW_TIMEOUT", "0")
+    monkeypatch.delenv("REVIEW_HEDGE_AFTER", raising=False)
+
+    errors = {"trial-primary": [StatusError(503), StatusError(400)]}
+
+    def request(model: str) -> Completion:
+        if errors.get(model):
+            raise errors[model].pop(0)
+        return Completion(CodeReviewResponse(smells=[], pr_comment=""), model)
+
+    # A server error opens the primary's circuit
+    assert serve(request)[1] == "trial-fallback"
+    assert get_breaker("trial-primary").state == "open"
+
+    # The trial after the cooldown fails with a bad request, which says nothing about the model
+    time.sleep(0.1)
+    assert serve(request)[1] == "trial-fallback"
+    assert get_breaker("trial-primary").state == "open"
+
+    assert serve(request)[1] == "trial-primary"
+    assert get_breaker("trial-primary").state == "closed"
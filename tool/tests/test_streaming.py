@@ -0,0 +1,24 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm.streaming import StreamingReviewParser  # noqa: E402
+
+
+def test_comment_is_passed_on_once_per_delta():
+    document = json.dumps({
+        "smells": [{"file": "a.py", "line": 1, "smell_type": "TODO", "message": "m", "severity": "INFO"}],
+        "pr_comment": 'Looks "fine"\n\U0001F600 overall',
+    })
+    smells, pieces = [], []
+    parser = StreamingReviewParser(smells.append, pieces.append)
+    deltas = [document[i:i + 7] for i in range(0, len(document), 7)]
+    for delta in deltas:
+        parser.feed(delta)
+
+    assert [smell.file for smell in smells] == ["a.py"]
+    assert "".join(pieces) == json.loads(document)["pr_comment"]
+    assert len(pieces) <= len(deltas)
+    assert all(pieces)
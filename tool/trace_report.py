@@ -0,0 +1,98 @@
+"""
+Summarize review traces written by generate_review.py across many runs.
+
+Prints p50/p95 of wall time, every stage, token usage, cost, retries and
+cache hits, plus totals. Accepts trace files and directories (searched
+recursively for *trace*.json).
+
+Usage: python trace_report.py <trace_or_dir> [...] [--json]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Iterator, Optional
+
+from llm.resilience import percentile
+
+METRICS = ("wall_seconds", "prompt_tokens", "completion_tokens", "cost_usd", "requests", "retries",
+           "cache_hits", "cache_misses")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Aggregate review traces")
+    parser.add_argument("paths", nargs="+", help="Trace files or directories containing them")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    return parser.parse_args()
+
+
+def iter_traces(paths: list[str]) -> Iterator[dict]:
+    for raw in paths:
+        path = Path(raw)
+        files = sorted(path.rglob("*trace*.json")) if path.is_dir() else [path]
+        for file in files:
+            try:
+                yield json.loads(file.read_text())
+            except (OSError, ValueError) as exc:
+                print(f"Skipping {file}: {exc}", file=sys.stderr)
+
+
+def describe(values: list[float]) -> Optional[dict]:
+    if not values:
+        return None
+    return {
+        "runs": len(values),
+        "p50": percentile(values, 0.5),
+        "p95": percentile(values, 0.95),
+        "total": sum(values),
+    }
+
+
+def summarize(traces: list[dict]) -> dict:
+    metrics = {
+        name: describe([t[name] for t in traces if t.get(name) is not None]) for name in METRICS
+    }
+    stage_names = sorted({name for t in traces for name in t.get("stages", {})})
+    stages = {
+        name: describe([t["stages"][name]["seconds"] for t in traces if name in t.get("stages", {})])
+        for name in stage_names
+    }
+    lookups = sum(t.get("cache_hits", 0) + t.get("cache_misses", 0) for t in traces)
+    return {
+        "runs": len(traces),
+        "metrics": metrics,
+        "stages": stages,
+        "cache_hit_rate": sum(t.get("cache_hits", 0) for t in traces) / lookups if lookups else None,
+        "unpriced_runs": sum(1 for t in traces if t.get("cost_usd") is None),
+    }
+
+
+def print_summary(summary: dict) -> None:
+    print(f"{summary['runs']} run(s)")
+    print(f"{'':<24}{'p50':>12}{'p95':>12}{'total':>14}")
+    rows = [(name, stats) for name, stats in summary["metrics"].items()]
+    rows += [(f"stage {name}", stats) for name, stats in summary["stages"].items()]
+    for name, stats in rows:
+        if stats is None:
+            continue
+        print(f"{name:<24}{stats['p50']:>12.4g}{stats['p95']:>12.4g}{stats['total']:>14.6g}")
+    if summary["cache_hit_rate"] is not None:
+        print(f"cache hit rate: {summary['cache_hit_rate']:.1%}")
+    if summary["unpriced_runs"]:
+        print(f"{summary['unpriced_runs']} run(s) used a model without a known price")
+
+
+def main():
+    args = parse_args()
+    traces = list(iter_traces(args.paths))
+    if not traces:
+        sys.exit("No traces found")
+    summary = summarize(traces)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 from .main import parse_args
 from .read_diff import read_diff
+from .split_diff import split_diff, split_diff_file
+from .diff_parser import iter_diff, iter_hunks
 
-__all__ = ['parse_args', 'read_diff']
+__all__ = ['parse_args', 'read_diff', 'split_diff', 'split_diff_file', 'iter_diff', 'iter_hunks']
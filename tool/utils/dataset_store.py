@@ -0,0 +1,204 @@
+import gzip
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional, Union
+
+INDEX_FILE = "index.jsonl"
+SEGMENT_PREFIX = "segment-"
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class RecordLocation:
+    segment: str
+    offset: int
+    length: int
+
+
+class DatasetStore:
+    """
+    Append-only store of PR dataset entries, one compact JSON record per line.
+
+    Records are appended to numbered segment files, which are rolled over at
+    `segment_bytes`. With `compress`, every record is written as its own gzip
+    member, so a segment is still a valid .jsonl.gz file and any record can be
+    decompressed on its own. A sidecar index, itself an append-only JSONL file,
+    maps each PR number to the segment, byte offset and length of its latest
+    record: lookups are a single seek and read, and an upsert is an append
+    whose index line supersedes the older one. `compact()` drops superseded
+    records. The store assumes a single writer at a time.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        compress: bool = False,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+    ):
+        self.directory = Path(directory)
+        self.compress = compress
+        self.segment_bytes = segment_bytes
+        self.index: dict[int, RecordLocation] = {}
+        self._tail: Optional[tuple[int, Optional[Path], int]] = None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    @property
+    def suffix(self) -> str:
+        return ".jsonl.gz" if self.compress else ".jsonl"
+
+    def _load_index(self) -> None:
+        path = self.directory / INDEX_FILE
+        if not path.exists():
+            return
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash while appending can leave a torn last line
+                    continue
+                self.index[entry["pr"]] = RecordLocation(entry["segment"], entry["offset"], entry["length"])
+
+    def _segment_paths(self) -> dict[int, Path]:
+        paths = {}
+        for path in self.directory.glob(f"{SEGMENT_PREFIX}*.jsonl*"):
+            number = path.name[len(SEGMENT_PREFIX):].split(".", 1)[0]
+            if number.isdigit():
+                paths[int(number)] = path
+        return paths
+
+    def segments(self) -> list[Path]:
+        return [path for _, path in sorted(self._segment_paths().items())]
+
+    def _encode(self, record: dict) -> bytes:
+        line = (json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n").encode()
+        return gzip.compress(line, mtime=0) if self.compress else line
+
+    def _append(self, record: dict, first_segment: int = 0, sync: bool = True) -> RecordLocation:
+        """Append one encoded record to the tail segment, never to one numbered below `first_segment`."""
+        data = self._encode(record)
+        if self._tail is None:
+            paths = self._segment_paths()
+            last = max(paths, default=0)
+            path = paths.get(last)
+            self._tail = (last, path, path.stat().st_size if path else 0)
+        number, path, size = self._tail
+        if (
+            path is None
+            or number < first_segment
+            or not path.name.endswith(self.suffix)
+            or size + len(data) > self.segment_bytes
+        ):
+            number = max(number + 1, first_segment)
+            path = self.directory / f"{SEGMENT_PREFIX}{number:05d}{self.suffix}"
+        with open(path, "ab") as f:
+            offset = f.tell()
+            f.write(data)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        self._tail = (number, path, offset + len(data))
+        return RecordLocation(path.name, offset, len(data))
+
+    def _sync_segments(self, names: set[str]) -> None:
+        for name in names:
+            with open(self.directory / name, "rb") as f:
+                os.fsync(f.fileno())
+
+    @staticmethod
+    def _index_line(pr_number: int, location: RecordLocation) -> str:
+        return json.dumps({"pr": pr_number, **asdict(location)}) + "\n"
+
+    def put(self, record: dict) -> RecordLocation:
+        """Insert or replace the record of `record["pr_number"]`."""
+        pr_number = int(record["pr_number"])
+        location = self._append(record)
+        # The index line is written last, so a crash never points at a partial record
+        with open(self.directory / INDEX_FILE, "a") as f:
+            f.write(self._index_line(pr_number, location))
+        self.index[pr_number] = location
+        return location
+
+    def put_many(self, records: Iterable[dict]) -> int:
+        """Bulk upsert with one fsync per segment instead of one per record."""
+        written = []
+        for record in records:
+            written.append((int(record["pr_number"]), self._append(record, sync=False)))
+        self._sync_segments({location.segment for _, location in written})
+        with open(self.directory / INDEX_FILE, "a") as f:
+            f.writelines(self._index_line(pr, location) for pr, location in written)
+        self.index.update(written)
+        return len(written)
+
+    def _read(self, f: BinaryIO, location: RecordLocation) -> bytes:
+        f.seek(location.offset)
+        data = f.read(location.length)
+        if location.segment.endswith(".gz"):
+            data = gzip.decompress(data)
+        return data
+
+    def get(self, pr_number: int) -> Optional[dict]:
+        location = self.index.get(int(pr_number))
+        if location is None:
+            return None
+        with open(self.directory / location.segment, "rb") as f:
+            return json.loads(self._read(f, location))
+
+    def __contains__(self, pr_number: int) -> bool:
+        return int(pr_number) in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def scan(self) -> Iterator[dict]:
+        """Yield the latest record of every PR, reading each segment front to back."""
+        for line in self.scan_raw():
+            yield json.loads(line)
+
+    def scan_raw(self) -> Iterator[bytes]:
+        """Like scan, but yield the undecoded JSON lines, e.g. to parse them in other processes."""
+        by_segment: dict[str, list[RecordLocation]] = {}
+        for location in self.index.values():
+            by_segment.setdefault(location.segment, []).append(location)
+        for segment in sorted(by_segment):
+            with open(self.directory / segment, "rb") as f:
+                for location in sorted(by_segment[segment], key=lambda loc: loc.offset):
+                    yield self._read(f, location)
+
+    def garbage_bytes(self) -> int:
+        """Bytes taken by superseded records."""
+        live = sum(location.length for location in self.index.values())
+        return sum(path.stat().st_size for path in self.segments()) - live
+
+    def compact(self) -> None:
+        """Rewrite the live records into new segments and delete the old ones."""
+        old_segments = self.segments()
+        first = max(self._segment_paths(), default=0) + 1
+        index = {}
+        for record in self.scan():
+            index[int(record["pr_number"])] = self._append(record, first, sync=False)
+        self._sync_segments({location.segment for location in index.values()})
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(fd, "w") as f:
+            f.writelines(self._index_line(pr, location) for pr, location in index.items())
+        os.replace(tmp_path, self.directory / INDEX_FILE)
+        self.index = index
+        for path in old_segments:
+            path.unlink()
+
+    def migrate(self, dataset_dir: Union[str, Path]) -> int:
+        """Import every pr_*.json file of `dataset_dir`; returns how many were imported."""
+        files = sorted(
+            Path(dataset_dir).glob("pr_*.json"),
+            key=lambda p: int(p.stem[3:]) if p.stem[3:].isdigit() else 0,
+        )
+        return self.put_many(json.loads(path.read_text()) for path in files)
+
+
+def is_store(path: Union[str, Path]) -> bool:
+    return (Path(path) / INDEX_FILE).exists()
@@ -0,0 +1,228 @@
+"""
+Streaming parser for unified diffs.
+
+The parser reads one line at a time and yields small records, so memory stays
+bounded by the largest hunk instead of the whole diff. Downstream stages can
+filter files, chunk hunks or map reported lines back to real line numbers
+without re-parsing the text.
+"""
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+HUNK_HEADER_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@ ?(.*)$")
+
+
+@dataclass(frozen=True)
+class FileHeader:
+    """Start of a file section: `diff --git` up to the first hunk."""
+    old_path: Optional[str]
+    new_path: Optional[str]
+    header_lines: tuple[str, ...]
+    is_binary: bool = False
+
+    @property
+    def path(self) -> str:
+        """Path of the file after the change (the old path for deletions)."""
+        return self.new_path or self.old_path or ""
+
+
+@dataclass(frozen=True)
+class HunkHeader:
+    """An `@@ -a,b +c,d @@` line."""
+    file: FileHeader
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+    section: str
+    raw: str
+
+
+@dataclass(frozen=True)
+class DiffLine:
+    """A line inside a hunk with its position in the old and new file."""
+    kind: str  # '+', '-', ' ' or '\\' for "\ No newline at end of file"
+    text: str
+    old_lineno: Optional[int]
+    new_lineno: Optional[int]
+
+    @property
+    def raw(self) -> str:
+        return f"{self.kind}{self.text}\n"
+
+
+DiffRecord = Union[FileHeader, HunkHeader, DiffLine]
+
+
+@dataclass
+class Hunk:
+    """A hunk with all of its lines, as grouped by iter_hunks."""
+    header: HunkHeader
+    lines: list[DiffLine] = field(default_factory=list)
+
+    @property
+    def file(self) -> FileHeader:
+        return self.header.file
+
+    @property
+    def path(self) -> str:
+        return self.header.file.path
+
+    def added_lines(self) -> list[DiffLine]:
+        return [line for line in self.lines if line.kind == "+"]
+
+    def contains_new_line(self, lineno: int) -> bool:
+        end = self.header.new_start + max(self.header.new_count, 1)
+        return self.header.new_start <= lineno < end
+
+    def text(self, with_file_header: bool = True) -> str:
+        """Render the hunk back to unified diff text."""
+        parts = list(self.file.header_lines) if with_file_header else []
+        parts.append(self.header.raw)
+        parts.extend(line.raw for line in self.lines)
+        return "".join(parts)
+
+
+def _strip_prefix(path: str) -> Optional[str]:
+    path = path.rstrip("\n").split("\t", 1)[0]
+    if path == "/dev/null":
+        return None
+    if path.startswith(("a/", "b/")):
+        return path[2:]
+    return path
+
+
+def _paths_from_git_line(line: str) -> tuple[Optional[str], Optional[str]]:
+    parts = line.rstrip("\n")[len("diff --git "):].split(" b/", 1)
+    if len(parts) != 2:
+        return None, None
+    return _strip_prefix(parts[0]), parts[1]
+
+
+def parse_lines(lines: Iterable[str]) -> Iterator[DiffRecord]:
+    """
+    Parse unified diff lines into FileHeader, HunkHeader and DiffLine records.
+
+    Args:
+        lines: Diff lines, with or without trailing newlines
+
+    Yields:
+        Records in diff order; every HunkHeader is preceded by its FileHeader
+    """
+    header_lines: list[str] = []
+    old_path = new_path = None
+    is_binary = False
+    current_file: Optional[FileHeader] = None
+    old_lineno = new_lineno = 0
+    old_left = new_left = 0
+
+    def file_header() -> FileHeader:
+        return FileHeader(old_path, new_path, tuple(header_lines), is_binary)
+
+    for line in lines:
+        if not line.endswith("\n"):
+            line += "\n"
+
+        if line.startswith("diff --git "):
+            # A truncated hunk must not swallow the next file
+            old_left = new_left = 0
+
+        if line.startswith("\\"):
+            yield DiffLine("\\", line[1:-1], None, None)
+        elif old_left > 0 or new_left > 0:
+            kind = line[0] if line[0] in "+- " else " "
+            text = line[1:-1] if line[0] in "+- " else line[:-1]
+            if kind == "+":
+                yield DiffLine(kind, text, None, new_lineno)
+                new_lineno += 1
+                new_left -= 1
+            elif kind == "-":
+                yield DiffLine(kind, text, old_lineno, None)
+                old_lineno += 1
+                old_left -= 1
+            else:
+                yield DiffLine(kind, text, old_lineno, new_lineno)
+                old_lineno += 1
+                new_lineno += 1
+                old_left -= 1
+                new_left -= 1
+        elif line.startswith("diff --git "):
+            if header_lines and current_file is None:
+                yield file_header()
+            header_lines = [line]
+            old_path, new_path = _paths_from_git_line(line)
+            is_binary = False
+            current_file = None
+        elif line.startswith("@@"):
+            match = HUNK_HEADER_RE.match(line.rstrip("\n"))
+            if not match:
+                continue
+            if current_file is None:
+                current_file = file_header()
+                yield current_file
+            old_start, old_count, new_start, new_count, section = match.groups()
+            old_count = 1 if old_count is None else int(old_count)
+            new_count = 1 if new_count is None else int(new_count)
+            yield HunkHeader(
+                current_file, int(old_start), old_count, int(new_start), new_count, section, line
+            )
+            old_lineno, new_lineno = int(old_start), int(new_start)
+            old_left, new_left = old_count, new_count
+        elif current_file is not None and line.startswith(("--- ", "diff ")):
+            # Plain unified diffs have no `diff --git` line: the next file starts at its own header
+            header_lines = [line]
+            old_path = _strip_prefix(line[4:]) if line.startswith("--- ") else None
+            new_path = None
+            is_binary = False
+            current_file = None
+        elif current_file is None:
+            # Extended header lines: index, mode, rename, ---/+++ and binary markers
+            header_lines.append(line)
+            if line.startswith("--- "):
+                old_path = _strip_prefix(line[4:])
+            elif line.startswith("+++ "):
+                new_path = _strip_prefix(line[4:])
+            elif line.startswith("Binary files ") or line.startswith("GIT binary patch"):
+                is_binary = True
+
+    if header_lines and current_file is None:
+        yield file_header()
+
+
+def iter_diff(diff_file: Union[str, Path]) -> Iterator[DiffRecord]:
+    """Stream records from a diff file without loading it into memory."""
+    with open(diff_file, "r", encoding="utf-8", errors="replace") as f:
+        yield from parse_lines(f)
+
+
+def group_hunks(records: Iterable[DiffRecord]) -> Iterator[Hunk]:
+    """Group a record stream into Hunk objects, holding one hunk at a time."""
+    hunk: Optional[Hunk] = None
+    for record in records:
+        if isinstance(record, HunkHeader):
+            if hunk is not None:
+                yield hunk
+            hunk = Hunk(record)
+        elif isinstance(record, DiffLine):
+            if hunk is not None:
+                hunk.lines.append(record)
+        elif hunk is not None:
+            yield hunk
+            hunk = None
+    if hunk is not None:
+        yield hunk
+
+
+def iter_hunks(diff_file: Union[str, Path]) -> Iterator[Hunk]:
+    """Stream the hunks of a diff file."""
+    return group_hunks(iter_diff(diff_file))
+
+
+def locate_line(hunks: Iterable[Hunk], path: str, lineno: int) -> Optional[Hunk]:
+    """Return the hunk that covers `lineno` of the new version of `path`, if any."""
+    for hunk in hunks:
+        if hunk.path == path and hunk.contains_new_line(lineno):
+            return hunk
+    return None
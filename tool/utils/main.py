@@ -3,7 +3,24 @@ import argparse
 def parse_args():
     parser = argparse.ArgumentParser(description='Process git diff file')
     parser.add_argument('diff_file', help='Path to the diff file')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Review hunks concurrently with this many workers (1 sends the whole diff at once)')
+    parser.add_argument('--pack', action='store_true',
+                        help='Pack hunks into the fewest requests that fit the model token budget')
+    parser.add_argument('--prefilter', action='store_true',
+                        help='Run fast local detectors first and only send uncovered hunks to the LLM')
+    parser.add_argument('--repo-root', default=None,
+                        help='Checkout of the PR head, used by the local detectors')
+    parser.add_argument('--state-file', default=None,
+                        help='Per-hunk results of earlier runs; only new or changed hunks are re-reviewed')
+    parser.add_argument('--trace-file', default='review_trace.json',
+                        help='Where to write the JSON trace of stage timings, tokens and cost')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream the review of the whole diff and write findings as they arrive')
     
     args = parser.parse_args()
+    if args.stream and (args.workers > 1 or args.pack or args.prefilter or args.state_file):
+        parser.error('--stream reviews the whole diff in one request and cannot be combined '
+                     'with --workers, --pack, --prefilter or --state-file')
 
     return args
@@ -0,0 +1,161 @@
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import Iterable, Optional
+
+# Smell categories shared by both tools. LLM smell types (and the ground-truth
+# labels of analysis.csv) are compared after normalize_smell_type; Sonar rules
+# by their key without the language prefix.
+SMELL_CATEGORIES = {
+    "LONG_PARAMETER_LIST": (
+        {"LONG_PARAMETER_LIST", "TOO_MANY_PARAMETERS", "EXCESSIVE_PARAMETERS"},
+        {"S107"},
+    ),
+    "DUPLICATE_CODE": (
+        {"DUPLICATE_CODE", "DUPLICATED_CODE", "CODE_DUPLICATION", "CODIGO_DUPLICADO",
+         "DUPLICATE_STRING_LITERAL", "DUPLICATED_STRING_LITERAL", "IDENTICAL_BRANCHES"},
+        {"S1192", "S1871", "S4144"},
+    ),
+    "GOD_METHOD": (
+        {"GOD_METHOD", "LONG_METHOD", "LONG_FUNCTION", "GOD_FUNCTION", "TOO_MANY_RETURNS"},
+        {"S138", "S1142"},
+    ),
+    "COMPLEXITY": (
+        {"COMPLEXIDADE_CICLOMATICA", "CYCLOMATIC_COMPLEXITY", "HIGH_CYCLOMATIC_COMPLEXITY",
+         "HIGH_COMPLEXITY", "COGNITIVE_COMPLEXITY", "COMPLEX_METHOD", "DEEP_NESTING",
+         "NESTED_CONDITIONALS", "COLLAPSIBLE_IF"},
+        {"S3776", "S1541", "FunctionComplexity", "S134", "S1066"},
+    ),
+    "FEATURE_ENVY": ({"FEATURE_ENVY"}, set()),
+    "TODO_COMMENT": ({"TODO_COMMENT", "FIXME_COMMENT", "HACK_COMMENT", "INCOMPLETE_WORK"}, {"S1135", "S1134"}),
+    "UNUSED_CODE": (
+        {"UNUSED_IMPORT", "UNUSED_VARIABLE", "UNUSED_PARAMETER", "DEAD_CODE", "DEAD_STORE",
+         "UNUSED_CODE", "COMMENTED_OUT_CODE"},
+        {"S1128", "S1481", "S1172", "S1854", "S125", "S1144"},
+    ),
+    "MAGIC_NUMBER": ({"MAGIC_NUMBER", "MAGIC_NUMBERS", "HARDCODED_VALUE"}, {"S109"}),
+    "NAMING": (
+        {"NAMING_CONVENTION", "POOR_NAMING", "BAD_NAMING", "NAMING"},
+        {"S100", "S101", "S116", "S117", "S1542"},
+    ),
+    "EXCEPTION_HANDLING": (
+        {"BARE_EXCEPT", "BROAD_EXCEPTION", "BROAD_EXCEPT", "SWALLOWED_EXCEPTION",
+         "MISSING_ERROR_HANDLING", "EMPTY_EXCEPT"},
+        {"S5754", "S2737", "S1166", "S108"},
+    ),
+}
+
+
+def normalize_smell_type(smell_type: str) -> str:
+    """'Código duplicado' and 'codigo-duplicado' both become CODIGO_DUPLICADO."""
+    ascii_text = unicodedata.normalize("NFKD", smell_type).encode("ascii", "ignore").decode()
+    return re.sub(r"[^A-Z0-9]+", "_", ascii_text.upper()).strip("_")
+
+
+_SMELL_CATEGORY = {
+    smell_type: category for category, (types, _) in SMELL_CATEGORIES.items() for smell_type in types
+}
+_RULE_CATEGORY = {
+    rule: category for category, (_, rules) in SMELL_CATEGORIES.items() for rule in rules
+}
+
+
+def smell_category(smell_type: str) -> Optional[str]:
+    return _SMELL_CATEGORY.get(normalize_smell_type(smell_type))
+
+
+def rule_category(rule: str) -> Optional[str]:
+    """Category of a Sonar rule such as 'python:S107'."""
+    return _RULE_CATEGORY.get(rule.split(":", 1)[-1])
+
+
+def sonar_path(issue: dict) -> str:
+    component = issue.get("component", "")
+    return component.split(":", 1)[-1] if ":" in component else ""
+
+
+@dataclass
+class Match:
+    llm: dict
+    sonar: dict
+
+    @property
+    def distance(self) -> int:
+        return abs(self.llm["line"] - self.sonar["line"])
+
+
+@dataclass
+class MatchResult:
+    matches: list[Match] = field(default_factory=list)
+    llm_only: list[dict] = field(default_factory=list)
+    sonar_only: list[dict] = field(default_factory=list)
+
+
+def _merge(llm: list[dict], sonar: list[dict], window: int, result: MatchResult) -> None:
+    """
+    Greedy one-to-one sweep over two lists sorted by line.
+
+    Every finding covers [line - window, line + window], so all windows have
+    the same length and pairing each LLM smell with the earliest unmatched
+    Sonar issue still in reach yields a maximum matching.
+    """
+    j = 0
+    for smell in llm:
+        while j < len(sonar) and sonar[j]["line"] < smell["line"] - window:
+            result.sonar_only.append(sonar[j])
+            j += 1
+        if j < len(sonar) and sonar[j]["line"] <= smell["line"] + window:
+            result.matches.append(Match(smell, sonar[j]))
+            j += 1
+        else:
+            result.llm_only.append(smell)
+    result.sonar_only.extend(sonar[j:])
+
+
+def match_findings(
+    llm_smells: Iterable[dict],
+    sonar_issues: Iterable[dict],
+    window: int = 0,
+    equivalence: bool = False,
+) -> MatchResult:
+    """
+    Pair LLM smells with SonarQube issues on the same file within ±`window` lines.
+
+    Both sides are bucketed by file (and, with `equivalence`, by the smell
+    category of SMELL_CATEGORIES), sorted by line and merged, which is
+    O(n log n) per file. Each finding is used in at most one match. With
+    `equivalence`, findings outside every category stay unmatched. Sonar
+    issues without a line never match.
+
+    Args:
+        llm_smells: Smells as stored in the dataset (file, line, smell_type, ...)
+        sonar_issues: Issues from the SonarQube API (component, line, rule, ...)
+        window: Maximum line distance between matched findings
+        equivalence: Only match findings of the same category
+
+    Returns:
+        Matches plus the unmatched findings of each tool
+    """
+    def llm_key(smell: dict) -> tuple:
+        category = smell_category(smell.get("smell_type", "")) if equivalence else ""
+        return smell.get("file", ""), category or ""
+
+    def sonar_key(issue: dict) -> tuple:
+        category = rule_category(issue.get("rule", "")) if equivalence else ""
+        # Uncategorized rules get a key no smell can have
+        return sonar_path(issue), category if category or not equivalence else "\0"
+
+    result = MatchResult()
+    sonar_list = []
+    for issue in sonar_issues:
+        (sonar_list if issue.get("line") is not None else result.sonar_only).append(issue)
+
+    llm_sorted = sorted(llm_smells, key=lambda s: (llm_key(s), s["line"]))
+    sonar_sorted = sorted(sonar_list, key=lambda i: (sonar_key(i), i["line"]))
+    llm_groups = {key: list(group) for key, group in groupby(llm_sorted, key=llm_key)}
+    sonar_groups = {key: list(group) for key, group in groupby(sonar_sorted, key=sonar_key)}
+
+    for key in sorted(llm_groups.keys() | sonar_groups.keys()):
+        _merge(llm_groups.get(key, []), sonar_groups.get(key, []), window, result)
+    return result
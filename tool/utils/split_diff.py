@@ -0,0 +1,46 @@
+from pathlib import Path
+from typing import Iterable, Iterator, Union
+
+from .diff_parser import Hunk, group_hunks, iter_hunks, parse_lines
+
+
+def iter_chunks(hunks: Iterable[Hunk], per_hunk: bool = True) -> Iterator[str]:
+    """
+    Render hunks as self-contained diff chunks that can be reviewed independently.
+
+    Every chunk keeps the file header (`diff --git`, `---`, `+++` ...) so the
+    reviewer still knows which file the hunk belongs to.
+
+    Args:
+        hunks: Hunks in diff order (see utils.diff_parser)
+        per_hunk: Emit one chunk per hunk; otherwise one chunk per file
+
+    Yields:
+        Diff chunks, in the order they appear in the diff
+    """
+    if per_hunk:
+        for hunk in hunks:
+            yield hunk.text()
+        return
+
+    current = None
+    parts: list[str] = []
+    for hunk in hunks:
+        if hunk.file is not current:
+            if parts:
+                yield "".join(parts)
+            current = hunk.file
+            parts = list(current.header_lines)
+        parts.append(hunk.text(with_file_header=False))
+    if parts:
+        yield "".join(parts)
+
+
+def split_diff(diff: str, per_hunk: bool = True) -> list[str]:
+    """Split unified diff text into per-hunk (or per-file) chunks."""
+    return list(iter_chunks(group_hunks(parse_lines(diff.splitlines(keepends=True))), per_hunk))
+
+
+def split_diff_file(diff_file: Union[str, Path], per_hunk: bool = True) -> Iterator[str]:
+    """Stream per-hunk (or per-file) chunks from a diff file without reading it whole."""
+    return iter_chunks(iter_hunks(diff_file), per_hunk)